@@ -1,5 +1,7 @@
-import glob
 import pandas as pd
+from data_catalog import catalog_files
+from data_readers import read_merged
+from utils.utils import concat_categorical, select_seed_locations
 from plotting_analysis import *
 from scipy import stats
 
@@ -11,7 +13,9 @@ def filter_slamfire(df, time_threshold=2):
     ]
     for day in seed_locations_merged_by_date:
         last_column = df.iloc[:, -1]  # last column is named aircraft
-        seed_by_plane = [group for _, group in day.groupby(last_column)]
+        seed_by_plane = [
+            group for _, group in day.groupby(last_column, observed=True)
+        ]
         for plane in seed_by_plane:
             time_diffs = plane.index.to_series().diff().dt.total_seconds()
             filtered_df = plane[time_diffs < time_threshold]
@@ -45,33 +49,29 @@ def filter_data(df):
     return filtered
 
 
-flights = glob.glob("split/*/*/*/")
+# aircraft last, filter_slamfire groups by the last column
+columns = [
+    "seed-a [cnt]",
+    "seed-b [cnt]",
+    "lwc [g/m^3]",
+    "rh [%]",
+    "temp_amb [C]",
+    "ss_total [%]",
+    "Ambient Temperature (C)",
+    "aircraft",
+]
+flights = catalog_files("flight", has_seeds=True)
 
 seed = []
 for flight in flights:
-
-    adc_fname = glob.glob(f"{flight}/*adc.csv")[0]
-    fin_fname = glob.glob(f"{flight}/*fin.csv")[0]
-    wind_fname = glob.glob(f"{flight}/*wind.csv")[0]
-
-    fin = pd.read_csv(fin_fname, parse_dates=True, index_col="datetime")
-    wind = pd.read_csv(wind_fname, parse_dates=True, index_col="datetime")
-    adc = pd.read_csv(adc_fname, parse_dates=True, index_col="datetime")
-
-    fin.index = fin.index.round("s")
-    wind.index = wind.index = wind.index.round("s")
-
-    fin = fin[~fin.index.duplicated(keep="first")]
-    wind = wind[~wind.index.duplicated(keep="first")]
-
-    merged = pd.concat([fin, wind], axis=1)
+    merged = read_merged(flight, columns=columns)
 
     # plot_3d_colorbar(lat, lon, alt, lwc)
 
     if (merged["seed-a [cnt]"].max() > 0) or (merged["seed-b [cnt]"].max() > 0):
         seed.append(merged)
 
-seed_merged = pd.concat(seed)
+seed_merged = concat_categorical(seed)
 
 summary = pd.read_csv("summary.csv")
 # plot_bar(summary, "seed_total")
@@ -79,10 +79,7 @@ summary = pd.read_csv("summary.csv")
 # plot_bar(summary, "lwc_median")
 
 
-seed_locations = seed_merged[
-    (seed_merged["seed-a [cnt]"].diff() > 0)
-    | (seed_merged["seed-b [cnt]"].diff() > 0)
-]
+seed_locations = select_seed_locations(seed_merged)
 
 seed_locations = filter_data(seed_locations)
 
@@ -1,12 +1,13 @@
 import pandas as pd
 import glob
-from config import SPLIT_DATA
+from data_readers import read_metadata
+from config import RAW_DATA
 
-metadata_files = glob.glob(f"{SPLIT_DATA}/**/*metadata.csv", recursive=True)
+raw_files = glob.glob(f"{RAW_DATA}/**/*.csv", recursive=True)
 
 metadata_list = []
-for f in metadata_files:
-    df = pd.read_csv(f)
+for f in raw_files:
+    df = read_metadata(f)
     metadata_list.append(df)
 
 metadata = pd.concat(metadata_list, ignore_index=True)
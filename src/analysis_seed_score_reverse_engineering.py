@@ -1,30 +1,27 @@
-import glob
 import pandas as pd
+from data_catalog import catalog_files
+from data_readers import read_merged
 from config import PLOTS_REVERSE
 from plotting_analysis import plot_scatter
 
 
-flights = glob.glob("*/*/*/*/")
+columns = [
+    "lwc [g/m^3]",
+    "lwc_dat [g/m^3]",
+    "temp_amb [C]",
+    "ss_temp [%]",
+    "rh [%]",
+    "ss_rh [%]",
+    "ss_lwc [%]",
+    "wind_w [m/s]",
+    "ss_updraft [%]",
+]
+flights = catalog_files("flight")
 
 
 df_list = []
 for flight in flights:
-
-    adc_fname = glob.glob(f"{flight}/*adc.csv")[0]
-    fin_fname = glob.glob(f"{flight}/*fin.csv")[0]
-    wind_fname = glob.glob(f"{flight}/*wind.csv")[0]
-
-    fin = pd.read_csv(fin_fname, parse_dates=True, index_col="datetime")
-    wind = pd.read_csv(wind_fname, parse_dates=True, index_col="datetime")
-    adc = pd.read_csv(adc_fname, parse_dates=True, index_col="datetime")
-
-    fin.index = fin.index.round("s")
-    wind.index = wind.index = wind.index.round("s")
-
-    fin = fin[~fin.index.duplicated(keep="first")]
-    wind = wind[~wind.index.duplicated(keep="first")]
-
-    merged = pd.concat([fin, wind], axis=1)
+    merged = read_merged(flight, columns=columns)
     df_list.append(merged)
 
 df_all = pd.concat(df_list)
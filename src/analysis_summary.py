@@ -1,35 +1,31 @@
 import pandas as pd
 from plotting_analysis import plot_bar, plot_bar_stacked,area_plot, plot_bar_multiple_side_by_side, plot_lines
+from utils.summary import penetration_column, penetration_columns
 from config import TABLES
 
+MAIN_THRESHOLD = 0.25
+
 
 summary = pd.read_csv(f"{TABLES}/summary.csv")
 
-summary["penetrations025_total"] = summary["penetrations025"] - summary["seed_total"]
-summary["penetrations03_total"] = summary["penetrations03"] - summary["seed_total"]
-summary["penetrations035_total"] = summary["penetrations035"] - summary["seed_total"]
+pen_cols = penetration_columns(summary)  # every threshold in the table
+main_col = penetration_column(MAIN_THRESHOLD)
 
 print(f'Total seed: {summary["seed_total"].sum()}')
-print(f'Penetrations 02: {summary["penetrations02"].sum()}')
-print(f'Penetrations 025: {summary["penetrations025"].sum()}')
-print(f'Penetrations 03: {summary["penetrations03"].sum()}')
-print(f'Penetrations 035: {summary["penetrations035"].sum()}')
-print(f'Penetrations 04: {summary["penetrations04"].sum()}')
-
-print(f'Penetrations 025 - total: {summary["penetrations025_total"].median()}')
-print(f'Penetrations 03  - total: {summary["penetrations03_total"].median()}')
-print(f'Penetrations 035 - total: {summary["penetrations035_total"].median()}')
+for threshold, col in pen_cols.items():
+    print(f"Penetrations {threshold}: {summary[col].sum()}")
 
 plot_bar(summary, "seed_total")
-plot_bar(summary, "penetrations025_total")
-plot_bar(summary, "penetrations03_total")
-plot_bar(summary, "penetrations035_total")
+for threshold, col in pen_cols.items():
+    summary[f"{col}_total"] = summary[col] - summary["seed_total"]
+    print(f"Penetrations {threshold} - total: {summary[f'{col}_total'].median()}")
+    plot_bar(summary, f"{col}_total")
 
 plot_bar_stacked(summary, "seed_a", "seed_b")
 
-plot_bar_multiple_side_by_side(summary, ["penetrations025", "seed_total", ])
+plot_bar_multiple_side_by_side(summary, [main_col, "seed_total", ])
 
-plot_lines(summary, ["penetrations025", "seed_total", ])
+plot_lines(summary, [main_col, "seed_total", ])
 
-area_plot(summary, [ "seed_total","penetrations025", ])
+area_plot(summary, [ "seed_total",main_col, ])
 
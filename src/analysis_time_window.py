@@ -1,38 +1,46 @@
 import pandas as pd
-import glob
-from config import BOXPLOTS, SPLIT_DATA
-from data_readers import read_wind_csv
+from config import BOXPLOTS
+from data_cache import read_wind_cached
+from data_catalog import catalog_files
 from plotting_time_window import (
     plot_barplot_by_relative_time,
-    plot_boxplot_by_relative_time,
+    plot_epoch_boxplot_by_relative_time,
     plot_flight_boxplots_by_event,
     plot_flight_timeseries_lwc_diff,
     plot_flight_timeseries_lwc_diff_over_threshold,
-    plot_multiple_timeseries,
 )
 
-from utils.utils import resample_1s, select_seed_locations
+from utils.epoch import EpochAggregator
+from utils.utils import (
+    resample_1s_fast,
+    select_seed_locations,
+)
 from utils.time_window import (
-    select_time_windows,
-    time_windows_to_df,
-    to_relative_time_index,
+    window_relative_seconds,
+    window_tensor,
+    windows_to_df,
 )
 
 
-wind_files = glob.glob(f"{SPLIT_DATA}/**/*wind.csv", recursive=True)
+wind_files = catalog_files("wind", has_seeds=True)
 threshold = 0.3
 window_seconds = 8
 window_timedelta = pd.Timedelta(seconds=window_seconds)
+# only these are aggregated over all flights
+rel_columns = ["lwc [g/m^3]", "rh [%]", "wind_w [m/s]", "ss_total [%]"]
 
-all_seed_event_windows_rel_list = []
+# per relative second statistics of the seed event windows of all flights
+aggregator = EpochAggregator(
+    window_relative_seconds(window_seconds), rel_columns
+)
 
 
 for count, wind_file in enumerate(wind_files):
     print(wind_file)
     # for wind_file in wind_files[2:3]:
-    wind = read_wind_csv(wind_file)
+    wind = read_wind_cached(wind_file)
     seed_locations = select_seed_locations(wind)
-    resampled = resample_1s(wind)
+    resampled = resample_1s_fast(wind)
 
     start_timestamp = resampled.index[0]
     date_time = start_timestamp.strftime("%Y%m%d_%H%M%S")
@@ -44,10 +52,9 @@ for count, wind_file in enumerate(wind_files):
     # plot_flight_timeseries_lwc_diff_over_threshold(resampled, threshold)
 
     if len(seed_locations) > 0:
-        seed_event_windows = select_time_windows(
+        seed_event_windows_df = windows_to_df(
             wind, seed_locations, window_timedelta
         )
-        seed_event_windows_df = time_windows_to_df(seed_event_windows)
         # plot_flight_boxplots_by_event(
         #     seed_event_windows_df,
         #     "lwc [g/m^3]",
@@ -57,49 +64,20 @@ for count, wind_file in enumerate(wind_files):
         #     filename=f"{BOXPLOTS}/per-seed-event/{date_time}_{aircraft}.png",
         # )
 
-        # seed_event_example = to_relative_time_index(seed_event_windows[0])
-        # plot_multiple_timeseries(seed_event_example, ["lwc [g/m^3]", "rh [%]","temp_amb [C]","wind_w [m/s]", "ss_total [%]"])
-
-        seed_event_windows_rel = [
-            to_relative_time_index(df) for df in seed_event_windows
-        ]
-        seed_event_windows_df_rel = pd.concat(seed_event_windows_rel)
-
-        all_seed_event_windows_rel_list.append(seed_event_windows_df_rel)
-
-        # plot_boxplot_by_relative_time(
-        #     seed_event_windows_df_rel,
-        #     "lwc [g/m^3]",
-        #     title=f"{start_timestamp}, {aircraft}",
-        #     filename=f"{BOXPLOTS}/by-seed-relative-time/{date_time}_{aircraft}_lwc.png",
-        # )
+        aggregator.add(
+            window_tensor(
+                wind, seed_locations, window_seconds, columns=rel_columns
+            )
+        )
 
     else:
         print(f"No seed events for {start_timestamp}, {aircraft}")
 
-all_seed_event_windows_rel_df = pd.concat(all_seed_event_windows_rel_list)
-
-plot_boxplot_by_relative_time(
-    all_seed_event_windows_rel_df,
-    "lwc [g/m^3]",
-    title="All flights",
-    filename=f"{BOXPLOTS}/all-flights/seed_lwc.png",
-)
-plot_boxplot_by_relative_time(
-    all_seed_event_windows_rel_df,
-    "rh [%]",
-    title="All flights",
-    filename=f"{BOXPLOTS}/all-flights/seed_rh.png",
-)
-plot_boxplot_by_relative_time(
-    all_seed_event_windows_rel_df,
-    "wind_w [m/s]",
-    title="All flights",
-    filename=f"{BOXPLOTS}/all-flights/seed_wind_w.png",
-)
-plot_boxplot_by_relative_time(
-    all_seed_event_windows_rel_df,
-    "ss_total [%]",
-    title="All flights",
-    filename=f"{BOXPLOTS}/all-flights/seed_ss_total.png",
-)
+for col in rel_columns:
+    var_tag = col.split(" ")[0]
+    plot_epoch_boxplot_by_relative_time(
+        aggregator,
+        col,
+        title="All flights",
+        filename=f"{BOXPLOTS}/all-flights/seed_{var_tag}.png",
+    )
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+from data_catalog import query_catalog
+from data_readers import SPLIT_EXTENSIONS, read_split, write_split
+from config import TABLES
+
+SAMPLE_FLIGHTS = 5
+PARTS = ["adc", "fin", "wind"]
+CODECS = [
+    ("csv", None),
+    ("csv.gz", None),
+    ("csv.zst", None),
+    ("parquet", "none"),
+    ("parquet", "snappy"),
+    ("parquet", "lz4"),
+    ("parquet", "zstd"),
+    ("parquet", "gzip"),
+    ("feather", "uncompressed"),
+    ("feather", "lz4"),
+    ("feather", "zstd"),
+]
+
+
+def sample_parts(n=SAMPLE_FLIGHTS):
+    """Reads the parts of n flights spread over the catalog"""
+    catalog = query_catalog()
+    step = max(1, len(catalog) // n)
+    flights = catalog.iloc[::step].head(n)
+    return [
+        (part, read_split(flight[part]))
+        for _, flight in flights.iterrows()
+        for part in PARTS
+    ]
+
+
+def benchmark_codec(parts, fmt, codec, tmp_dir):
+    """Writes and reads back the sample parts in a format and codec.
+    Returns the total size in MB and write and read seconds."""
+    size = write_seconds = read_seconds = 0
+    for count, (part, df) in enumerate(parts):
+        fname = f"{tmp_dir}/{count}_{part}{SPLIT_EXTENSIONS[fmt]}"
+        start = time.perf_counter()
+        write_split(df, fname, part, codec=codec)
+        write_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        read_split(fname)
+        read_seconds += time.perf_counter() - start
+        size += os.path.getsize(fname)
+    return {
+        "format": fmt,
+        "codec": codec or "",
+        "MB": size / 1e6,
+        "write_s": write_seconds,
+        "read_s": read_seconds,
+    }
+
+
+if __name__ == "__main__":
+    parts = sample_parts()
+    print(f"Benchmarking {len(parts)} parts")
+    rows = []
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for fmt, codec in CODECS:
+            try:
+                rows.append(benchmark_codec(parts, fmt, codec, tmp_dir))
+            except (ImportError, ValueError) as e:
+                print(f"Skipping {fmt} {codec}: {e}")
+    finally:
+        shutil.rmtree(tmp_dir)
+    results = pd.DataFrame(rows)
+    results["ratio"] = results["MB"].iloc[0] / results["MB"]
+    results = results.sort_values("read_s")
+    print(results.to_string(index=False, float_format="%.3f"))
+    results.to_csv(f"{TABLES}/codec_benchmark.csv", index=False)
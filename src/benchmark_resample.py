@@ -0,0 +1,45 @@
+import time
+import pandas as pd
+from data_cache import read_wind_cached
+from data_catalog import query_catalog
+from utils.utils import missing_seconds, resample_1s, resample_1s_fast
+from config import TABLES
+
+REPEATS = 5
+
+
+def longest_flight():
+    """Reads the wind part of the flight with the most wind records"""
+    catalog = query_catalog()
+    flight = catalog.loc[catalog["wind_rows"].idxmax()]
+    return flight["wind"], read_wind_cached(flight["wind"])
+
+
+def best_seconds(func, df, repeats=REPEATS):
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(df)
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+if __name__ == "__main__":
+    wind_file, wind = longest_flight()
+    print(f"Benchmarking {wind_file}, {len(wind)} records")
+    pd.testing.assert_frame_equal(resample_1s(wind), resample_1s_fast(wind))
+    rows = [
+        {"function": "resample_1s", "s": best_seconds(resample_1s, wind)},
+        {
+            "function": "resample_1s_fast",
+            "s": best_seconds(resample_1s_fast, wind),
+        },
+        {
+            "function": "missing_seconds",
+            "s": best_seconds(lambda df: missing_seconds(df.index), wind),
+        },
+    ]
+    results = pd.DataFrame(rows)
+    results["speedup"] = results["s"].iloc[0] / results["s"]
+    print(results.to_string(index=False, float_format="%.4f"))
+    results.to_csv(f"{TABLES}/resample_benchmark.csv", index=False)
@@ -5,8 +5,9 @@ import matplotlib.pyplot as plt
 from pandas.errors import EmptyDataError
 import seaborn as sns
 
-from data_readers import read_wind_csv
-from utils.utils import select_seed_locations
+from data_cache import read_wind_cached
+from utils.seeds import event_rows, seed_events
+from utils.utils import count_over_thresholds, select_seed_locations
 from plotting_case_study import (
     plot_flight_timeseries_with_seed_and_penetration_vlines,
     plot_bar_pens_per_window,
@@ -21,9 +22,8 @@ from plotting_case_study import (
 )
 from utils.summary import calc_summary
 from utils.time_window import (
-    select_time_windows,
-    time_windows_to_df,
-    to_relative_time_index,
+    relative_time_windows,
+    windows_to_df,
 )
 from plotting_time_window import (
     plot_boxplot_by_relative_time,
@@ -70,13 +70,12 @@ def compress_cloud_timeseries(df, max_nans_in_a_row=4):
 
 def plot_thresholds(wind, seed_locations):
     lwc_thresholds = np.arange(start=0.2, stop=1, step=0.02)
-    pen_thresholds_dict_list = []
-    for threshold in lwc_thresholds:
-        penetration_count = len(wind[wind["lwc [g/m^3]"] > threshold])
-        pen_thresholds_dict_list.append(
-            {"lwc_threshold": threshold, "penetrations": penetration_count}
-        )
-    penetrations_per_threshold = pd.DataFrame(pen_thresholds_dict_list)
+    penetration_counts = count_over_thresholds(
+        wind["lwc [g/m^3]"], lwc_thresholds
+    )
+    penetrations_per_threshold = pd.DataFrame(
+        {"lwc_threshold": lwc_thresholds, "penetrations": penetration_counts}
+    )
     print(penetrations_per_threshold)
 
     x = penetrations_per_threshold["lwc_threshold"]
@@ -91,7 +90,7 @@ def plot_thresholds(wind, seed_locations):
 wind_file = f"{SPLIT_DATA}/Spring 2025/CS02/20250429051654/cwip_CS02_20250429051654_wind.csv"
 # wind_file = "data/split/Spring 2025/CS04/20250429120855/cwip_CS04_20250429120855_wind.csv"
 
-wind_df = read_wind_csv(wind_file)
+wind_df = read_wind_cached(wind_file)
 
 start_ts = wind_df.index[0]
 end_ts = wind_df.index[-1]
@@ -103,9 +102,9 @@ aircraft = wind_df["aircraft"].iloc[0]
 
 
 cloud_mask = wind_df["lwc [g/m^3]"] > 0.3
-flare_mask = (wind_df["seed-a [cnt]"].diff() > 0) | (
-    wind_df["seed-b [cnt]"].diff() > 0
-)
+seed_event_table, _ = seed_events(wind_df)
+flare_mask = pd.Series(False, index=wind_df.index)
+flare_mask.iloc[event_rows(seed_event_table)] = True
 wind_df["is_in_cloud"] = cloud_mask
 wind_df["flare_fired"] = flare_mask
 
@@ -117,7 +116,7 @@ in_cloud = wind_df[cloud_mask].assign(in_cloud_id=in_cloud_ids)
 # in_cloud_or_flare_fired = wind_df[cloud_mask | flare_mask]
 flares_in_cloud = wind_df[cloud_mask & flare_mask]
 
-seeds = select_seed_locations(wind_df)
+seeds = select_seed_locations(wind_df, seed_event_table)
 seeds["seed_id"] = range(1, len(seeds) + 1)
 
 
@@ -232,11 +231,9 @@ for pen_id, group in wind_df.groupby("cloud_id"):
 
 
 win_td = pd.Timedelta(seconds=WINDOW_SEC)
-seed_windows_list = select_time_windows(wind_df, seeds, win_td)
-pen_windows_list = select_time_windows(wind_df, in_cloud, win_td)
 
-seed_windows_df = time_windows_to_df(seed_windows_list)
-pen_windows_df = time_windows_to_df(pen_windows_list)
+seed_windows_df = windows_to_df(wind_df, seeds, win_td)
+pen_windows_df = windows_to_df(wind_df, in_cloud, win_td)
 
 # seed_in_pen = pen_windows_df.loc[seeds.index]
 seed_in_pen = pd.merge(seeds, pen_windows_df, how="inner", on="datetime")
@@ -254,11 +251,8 @@ windows_description = describe_time_windows(
 # plot_seed_window_timeseries(pen_windows_list, aircraft, dt_str, "penetration")
 
 
-seed_windows_rel_list = [to_relative_time_index(df) for df in seed_windows_list]
-seed_windows_rel_df = pd.concat(seed_windows_rel_list)
-
-pen_windows_rel_list = [to_relative_time_index(df) for df in pen_windows_list]
-pen_windows_rel_df = pd.concat(pen_windows_rel_list)
+seed_windows_rel_df = relative_time_windows(wind_df, seeds, win_td)
+pen_windows_rel_df = relative_time_windows(wind_df, in_cloud, win_td)
 
 # All events in one plot
 plot_flight_boxplots_by_event(
@@ -5,6 +5,10 @@ PARENT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
 SHAPEFILES = os.path.join(PARENT, "data", "shapefiles")
 RAW_DATA = os.path.join(PARENT, "data", "KSA CWIP Files")
 SPLIT_DATA = os.path.join(PARENT, "data", "split")
+SPLIT_FORMAT = "csv"  # "csv", "csv.gz", "csv.zst", "parquet" or "feather"
+# parquet: "snappy", "zstd", "lz4", "gzip", "brotli" or "none",
+# feather: "lz4", "zstd" or "uncompressed", None for the library default
+SPLIT_CODEC = None
 
 
 TABLES = os.path.join(PARENT, "out", "tables")
@@ -21,3 +25,8 @@ CS_TIMESERIES = os.path.join(PARENT, "out", "plots", "case-study", "timeseries")
 CS_MAPS = os.path.join(PARENT, "out", "plots", "case-study", "maps")
 
 PLOTS_REVERSE = os.path.join(PARENT, "plots", "reverse-engineering")
+
+MANIFEST = os.path.join(SPLIT_DATA, "manifest.json")
+CATALOG = os.path.join(SPLIT_DATA, "catalog.csv")
+WIND_CACHE = os.path.join(PARENT, "data", "cache", "wind")
+SUMMARY_CACHE = os.path.join(PARENT, "data", "cache", "summary.pkl")
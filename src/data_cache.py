@@ -0,0 +1,99 @@
+import functools
+import glob
+import hashlib
+import os
+import pandas as pd
+from data_readers import read_wind_csv, slice_frame
+from config import WIND_CACHE
+
+MEMORY_ITEMS = 32  # cleaned wind frames kept in memory
+CACHE_VERSION = 2  # bump when read_wind_csv cleaning changes
+
+stats = {"disk_hits": 0, "misses": 0, "disk_errors": 0}
+
+
+def cache_key(path):
+    return hashlib.sha1(path.encode()).hexdigest()
+
+
+def cache_file(path, size, mtime_ns, cache_dir=WIND_CACHE):
+    """Path of the on-disk cache of a wind file. The source size, mtime and
+    CACHE_VERSION are part of the name, so a stale cache is never found."""
+    name = f"{cache_key(path)}_{size}_{mtime_ns}_v{CACHE_VERSION}.pkl"
+    return os.path.join(cache_dir, name)
+
+
+def read_disk_cache(cached):
+    """Returns the cached frame, or None if missing or unreadable"""
+    if not os.path.exists(cached):
+        return None
+    try:
+        return pd.read_pickle(cached)
+    except Exception as e:
+        stats["disk_errors"] += 1
+        print(f"Note: ignoring unreadable wind cache {cached}: {e}")
+        return None
+
+
+def write_disk_cache(path, cached, frame):
+    """Writes the cache of a wind file and removes its stale caches"""
+    cache_dir = os.path.dirname(cached)
+    stale_pattern = os.path.join(cache_dir, f"{cache_key(path)}_*.pkl")
+    for stale in glob.glob(stale_pattern):
+        os.remove(stale)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = f"{cached}.{os.getpid()}.tmp"
+    pd.to_pickle(frame, tmp_file)
+    os.replace(tmp_file, cached)
+
+
+@functools.lru_cache(maxsize=MEMORY_ITEMS)
+def load_wind(path, size, mtime_ns):
+    """Loads a cleaned wind frame from the disk cache, or parses the file.
+    Memoized on path, size and mtime so a changed file is read again."""
+    cached = cache_file(path, size, mtime_ns)
+    frame = read_disk_cache(cached)
+    if frame is not None:
+        stats["disk_hits"] += 1
+        return frame
+    stats["misses"] += 1
+    frame = read_wind_csv(path)
+    write_disk_cache(path, cached, frame)
+    return frame
+
+
+def read_wind_cached(fname, columns=None, start=None, end=None):
+    """Reads *wind file like read_wind_csv, parsing each file at most once.
+    Files not cached yet are read whole and cached, columns and time ranges
+    are selected from the cached frame. Returns a copy, callers may modify
+    it."""
+    path = os.path.realpath(fname)
+    stat = os.stat(path)
+    frame = load_wind(path, stat.st_size, stat.st_mtime_ns)
+    return slice_frame(frame, columns, start, end).copy()
+
+
+def cache_stats():
+    """Returns memory and disk hits, misses (files parsed) and cache sizes"""
+    info = load_wind.cache_info()
+    return {
+        "memory_hits": info.hits,
+        **stats,
+        "memory_items": info.currsize,
+        "memory_max_items": info.maxsize,
+    }
+
+
+def print_cache_stats():
+    print("Wind cache: " + ", ".join(f"{k}={v}" for k, v in cache_stats().items()))
+
+
+def clear_cache(disk=False, cache_dir=WIND_CACHE):
+    """Empties the in-memory cache, and the on-disk cache if disk is True"""
+    load_wind.cache_clear()
+    for key in stats:
+        stats[key] = 0
+    if disk and os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith(".pkl"):
+                os.remove(os.path.join(cache_dir, name))
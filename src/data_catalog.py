@@ -0,0 +1,196 @@
+import os
+import numpy as np
+import pandas as pd
+from data_readers import (
+    clean_wind_index,
+    split_files,
+    split_stream,
+)
+from data_cache import read_wind_cached
+from utils.summary import FlightAccumulator
+from config import CATALOG, SPLIT_DATA
+
+CATALOG_COLUMNS = [
+    "lat [deg]",
+    "lon [deg]",
+    "seed-a [cnt]",
+    "seed-b [cnt]",
+    "lwc [g/m^3]",
+]
+CATALOG_THRESHOLD = 0.3  # LWC diff (g/m^3) of the penetration count
+
+
+class CatalogAccumulator(FlightAccumulator):
+    """Describes one flight for the catalog from a stream of wind chunks in
+    time order, keeping running values instead of the wind records.
+        acc = CatalogAccumulator()
+        for chunk in chunks:
+            acc.update(chunk)
+        entry = acc.entry(raw_file, outputs, rows)"""
+
+    def __init__(self):
+        super().__init__([CATALOG_THRESHOLD])
+        self.start = self.end = None
+        self.wind_rows = 0
+        self.coords = {}  # min and max of the coordinate columns present
+
+    def update(self, wind):
+        columns = wind.columns.intersection(CATALOG_COLUMNS)
+        wind = self.unseen(clean_wind_index(wind[columns]))
+        if len(wind) == 0:
+            return
+        if self.start is None:
+            self.start, self.end = wind.index.min(), wind.index.max()
+        self.start = min(self.start, wind.index.min())
+        self.end = max(self.end, wind.index.max())
+        self.wind_rows += len(wind)
+        for col in wind.columns.intersection(["lat [deg]", "lon [deg]"]):
+            low, high = self.coords.get(col, (np.nan, np.nan))
+            self.coords[col] = (
+                np.fmin(low, wind[col].min()),
+                np.fmax(high, wind[col].max()),
+            )
+        super().update(wind)
+
+    def entry(self, raw_file, outputs, rows):
+        """rows holds the number of records written for each part"""
+        paths = {split_stream(path): path for path in outputs}
+        entry = {
+            "raw_file": raw_file,
+            "flight": os.path.dirname(paths["wind"]),
+            **paths,
+            "period": os.path.normpath(paths["wind"]).split(os.sep)[-4],
+            "aircraft": os.path.normpath(paths["wind"]).split(os.sep)[-3],
+            "start": self.start,
+            "end": self.end,
+            **{f"{part}_rows": count for part, count in rows.items()},
+            "wind_rows": self.wind_rows,  # rows left after cleaning, as read
+        }
+        for col, name in [("lat [deg]", "lat"), ("lon [deg]", "lon")]:
+            low, high = self.coords.get(col, (None, None))
+            entry[f"{name}_min"] = low
+            entry[f"{name}_max"] = high
+        entry["seed_a"] = self.seed_count("seed-a") or 0
+        entry["seed_b"] = self.seed_count("seed-b") or 0
+        entry["seed_total"] = entry["seed_a"] + entry["seed_b"]
+        entry["seed_events"] = self.seed_events
+        entry["penetrations"] = int(self.penetrations[0])
+        return entry
+
+
+def catalog_entry(raw_file, outputs, wind, rows):
+    """Describes one split flight for the catalog.
+    wind needs at least the CATALOG_COLUMNS present in the flight,
+    rows holds the number of records written for each part."""
+    accumulator = CatalogAccumulator()
+    accumulator.update(wind)
+    return accumulator.entry(raw_file, outputs, rows)
+
+
+def build_catalog(split_dir=SPLIT_DATA, skip=[]):
+    """Builds the catalog from existing split files by reading every wind
+    file, except those in skip. Only needed for split data written before
+    the catalog existed."""
+    entries = []
+    for wind_file in split_files("wind", split_dir):
+        if wind_file in skip:
+            continue
+        wind = read_wind_cached(wind_file)
+        flight = os.path.dirname(wind_file)
+        outputs = split_files("", flight)  # all parts and the metadata
+        entries.append(catalog_entry(None, outputs, wind, {"wind": len(wind)}))
+    return pd.DataFrame(entries)
+
+
+def read_catalog(catalog_file=CATALOG, skip=[]):
+    """Reads the flight catalog, one row per split flight.
+    The catalog is built from the split files next to it if missing."""
+    if not os.path.exists(catalog_file):
+        catalog = build_catalog(os.path.dirname(catalog_file), skip)
+        if len(catalog) > 0:
+            write_catalog(catalog, catalog_file)
+        return catalog
+    return pd.read_csv(catalog_file, parse_dates=["start", "end"])
+
+
+def write_catalog(catalog, catalog_file=CATALOG):
+    os.makedirs(os.path.dirname(catalog_file), exist_ok=True)
+    catalog = catalog.sort_values("start").reset_index(drop=True)
+    tmp_file = f"{catalog_file}.tmp"
+    catalog.to_csv(tmp_file, index=False)
+    os.replace(tmp_file, catalog_file)
+
+
+def update_catalog(entries, removed=[], catalog_file=CATALOG):
+    """Replaces the catalog rows of the given raw files with new entries
+    and drops the rows of removed raw files."""
+    wind_files = {entry["wind"] for entry in entries}
+    catalog = read_catalog(catalog_file, skip=wind_files)
+    replaced = set(removed) | {entry["raw_file"] for entry in entries}
+    if len(catalog) > 0:
+        catalog = catalog[
+            ~catalog["raw_file"].isin(replaced)
+            & ~catalog["wind"].isin(wind_files)
+        ]
+    new_rows = pd.DataFrame(entries)
+    if len(new_rows) > 0:
+        catalog = pd.concat([catalog, new_rows], ignore_index=True)
+    write_catalog(catalog, catalog_file)
+    return catalog
+
+
+def as_list(value):
+    return [value] if isinstance(value, str) else list(value)
+
+
+def date_range(date=None, start=None, end=None):
+    """Returns the time range of a date ("2025", "2025-04", "2025-04-29")
+    narrowed by start and end."""
+    if date is None:
+        return start, end
+    date = pd.Period(date)
+    start = max(date.start_time, pd.Timestamp(start or date.start_time))
+    end = min(date.end_time, pd.Timestamp(end or date.end_time))
+    return start, end
+
+
+def query_catalog(
+    catalog=None,
+    period=None,
+    aircraft=None,
+    start=None,
+    end=None,
+    has_seeds=None,
+    min_rows=1,
+    date=None,
+):
+    """Selects flights from the catalog.
+    period and aircraft accept a value or a list, start/end select flights
+    that overlap the time range, date selects flights that overlap a year,
+    month or day, has_seeds selects flights with (or without) seed events
+    and min_rows skips flights with fewer wind records."""
+    if catalog is None:
+        catalog = read_catalog()
+    if len(catalog) == 0:
+        return catalog
+    start, end = date_range(date, start, end)
+    mask = catalog["wind_rows"] >= min_rows
+    if period is not None:
+        mask &= catalog["period"].isin(as_list(period))
+    if aircraft is not None:
+        mask &= catalog["aircraft"].isin(as_list(aircraft))
+    if start is not None:
+        mask &= catalog["end"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= catalog["start"] <= pd.Timestamp(end)
+    if has_seeds is not None:
+        mask &= (catalog["seed_events"] > 0) == has_seeds
+    return catalog[mask]
+
+
+def catalog_files(part="wind", **query):
+    """Returns the split files of a part for the flights matching a query"""
+    flights = query_catalog(**query)
+    if len(flights) == 0:
+        return []
+    return list(flights[part])
@@ -0,0 +1,54 @@
+import pandas as pd
+from data_cache import read_wind_cached
+from data_catalog import date_range, query_catalog
+from data_readers import read_merged, read_split
+from utils.utils import concat_categorical
+
+
+def read_partition(flight, part, columns=None, start=None, end=None):
+    """Reads one part of a catalog flight, pushing columns and the time
+    range down into the reader."""
+    if part == "wind":
+        return read_wind_cached(
+            flight["wind"], columns=columns, start=start, end=end
+        )
+    if part == "merged":
+        return read_merged(flight["flight"], columns, start, end)
+    return read_split(flight[part], columns=columns, start=start, end=end)
+
+
+def query_dataset(
+    part="wind",
+    columns=None,
+    period=None,
+    aircraft=None,
+    date=None,
+    start=None,
+    end=None,
+    has_seeds=None,
+    catalog=None,
+):
+    """Reads the records of a part (adc, fin, wind, merged) matching
+    a query, e.g. wind lat/lon of Spring 2025, aircraft CS02 in April:
+        query_dataset("wind", ["lat [deg]", "lon [deg]"],
+                      period="Spring 2025", aircraft="CS02", date="2025-04")
+    Only flights whose partition keys and time range match are opened, and
+    only the requested columns and records are read from each."""
+    flights = query_catalog(
+        catalog,
+        period=period,
+        aircraft=aircraft,
+        start=start,
+        end=end,
+        has_seeds=has_seeds,
+        date=date,
+    )
+    start, end = date_range(date, start, end)
+    frames = [
+        read_partition(flight, part, columns, start, end)
+        for _, flight in flights.iterrows()
+    ]
+    frames = [df for df in frames if len(df) > 0]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return concat_categorical(frames)
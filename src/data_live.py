@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+from data_readers import (
+    PREAMBLE_ROWS,
+    parse_header_block,
+    parse_records,
+    stamp_flight,
+)
+from data_split_raw import PartAppender, create_dest_path
+from config import SPLIT_DATA
+
+POLL_SECONDS = 0.2  # wait between reads when no new data, bounds latency
+IDLE_SECONDS = 60  # stop following after this long without new data
+
+
+def tail_lines(f, poll=POLL_SECONDS, idle=IDLE_SECONDS):
+    """Yields lists of the complete lines appended to a file opened in
+    binary mode. A partial trailing line is held back until its newline
+    is written. Stops after idle seconds without new data."""
+    partial = b""
+    last_data = time.monotonic()
+    while True:
+        block = f.read()
+        if block:
+            last_data = time.monotonic()
+            lines = (partial + block).split(b"\n")
+            partial = lines.pop()
+            if lines:
+                yield [line + b"\n" for line in lines]
+            continue
+        if idle is not None and time.monotonic() - last_data > idle:
+            if partial:
+                print(f"Note: dropping incomplete last line {partial[:40]}")
+            return
+        time.sleep(poll)
+
+
+def follow_cwip(fname, poll=POLL_SECONDS, idle=IDLE_SECONDS):
+    """Follows a raw CWIP file while it is being recorded.
+    Returns the HeaderBlock, once the preamble is written, and a generator
+    of dicts with the typed ADC, FIN and WIND records of each read."""
+    f = open(fname, "rb")
+    lines = tail_lines(f, poll, idle)
+    preamble = []
+    for block in lines:
+        preamble += block
+        if len(preamble) >= PREAMBLE_ROWS:
+            break
+    if len(preamble) < PREAMBLE_ROWS:
+        f.close()
+        raise ValueError(f"Incomplete preamble in {fname}")
+    preamble_text = b"".join(preamble[:PREAMBLE_ROWS]).decode()
+    header_block = parse_header_block(preamble_text)
+
+    def records():
+        with f:
+            pending = preamble[PREAMBLE_ROWS:]
+            if pending:
+                yield parse_records(pending, header_block.headers, fname)
+            for block in lines:
+                yield parse_records(block, header_block.headers, fname)
+
+    return header_block, records()
+
+
+class SplitAppender:
+    """Subscriber that appends live records to the split files of the
+    flight, as data_split_raw does in chunked mode. Csv parts can be read
+    while the flight is recorded, parquet parts only once closed."""
+
+    def __init__(self, fname, header_block, output_dir=SPLIT_DATA, fmt="csv"):
+        metadata_wide = header_block.metadata_wide()
+        self.aircraft = metadata_wide["AircraftID"].values[0].strip()
+        self.period = os.path.dirname(fname).split(os.sep)[-2]
+        dest_path = create_dest_path(
+            fname, output_dir, self.period, self.aircraft
+        )
+        metadata_wide.to_csv(f"{dest_path}_metadata.csv", index=False)
+        self.appenders = {
+            part: PartAppender(f"{dest_path}_{part}.{fmt}", part)
+            for part in ["adc", "wind", "fin"]
+        }
+
+    def __call__(self, parts):
+        for part, appender in self.appenders.items():
+            stamp_flight(parts[part], self.aircraft, self.period)
+            appender.append(parts[part])
+
+    def close(self):
+        for appender in self.appenders.values():
+            appender.close()
+
+
+def print_wind(parts):
+    """Subscriber that prints the latest LWC and seed counters"""
+    wind = parts["wind"]
+    if len(wind) == 0:
+        return
+    last = wind.iloc[-1]
+    print(
+        f"{wind.index[-1]}  lwc: {last['lwc [g/m^3]']:.3f} g/m^3  "
+        f"seed-a: {last['seed-a [cnt]']:.0f}  "
+        f"seed-b: {last['seed-b [cnt]']:.0f}  ({len(wind)} new records)"
+    )
+
+
+def run_live(
+    fname,
+    subscribers=[],
+    output_dir=None,
+    fmt="csv",
+    poll=POLL_SECONDS,
+    idle=IDLE_SECONDS,
+):
+    """Follows a raw CWIP file and passes each block of new records to the
+    subscribers, and appends them to split files if output_dir is given."""
+    header_block, records = follow_cwip(fname, poll, idle)
+    subscribers = list(subscribers)
+    if output_dir:
+        subscribers.append(SplitAppender(fname, header_block, output_dir, fmt))
+    try:
+        for parts in records:
+            for subscriber in subscribers:
+                subscriber(parts)
+    finally:
+        for subscriber in subscribers:
+            if hasattr(subscriber, "close"):
+                subscriber.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python data_live.py <raw CWIP file being recorded>")
+        sys.exit(1)
+    run_live(sys.argv[1], [print_wind], output_dir=SPLIT_DATA)
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+from config import MANIFEST
+
+
+def file_hash(fname, block_size=1 << 20):
+    sha = hashlib.sha256()
+    with open(fname, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def file_stat(fname):
+    stat = os.stat(fname)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def read_manifest(manifest_file=MANIFEST):
+    """Reads the manifest of split raw files.
+    Maps each raw file to its size, mtime, sha256 and split outputs."""
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file) as f:
+        return json.load(f)
+
+
+def write_manifest(manifest, manifest_file=MANIFEST):
+    os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_file, manifest_file)
+
+
+def changed_files(files, manifest):
+    """Compares raw files against the manifest.
+    Returns new or changed files and manifest files that no longer exist.
+    Files whose outputs are missing count as changed. Files are only hashed
+    when size or mtime differ from the manifest, entries whose content is
+    unchanged get their mtime refreshed."""
+    changed = []
+    for fname in files:
+        entry = manifest.get(fname)
+        stat = file_stat(fname)
+        if entry and not all(map(os.path.exists, entry["outputs"])):
+            changed.append(fname)
+            continue
+        if entry and stat == {"size": entry["size"], "mtime": entry["mtime"]}:
+            continue
+        if entry and entry["size"] == stat["size"]:
+            if file_hash(fname) == entry["sha256"]:
+                entry["mtime"] = stat["mtime"]
+                continue
+        changed.append(fname)
+    existing = set(files)
+    deleted = [fname for fname in manifest if fname not in existing]
+    return changed, deleted
+
+
+def manifest_entry(fname, outputs, fmt="csv", codec=None):
+    return {
+        **file_stat(fname),
+        "sha256": file_hash(fname),
+        "format": fmt,
+        "codec": codec,
+        "outputs": outputs,
+    }
+
+
+def remove_outputs(outputs):
+    """Deletes split outputs and the directories they leave empty."""
+    for path in outputs:
+        if os.path.exists(path):
+            os.remove(path)
+        dest_dir = os.path.dirname(path)
+        if os.path.isdir(dest_dir) and not os.listdir(dest_dir):
+            os.removedirs(dest_dir)
@@ -1,35 +1,165 @@
+import io
+import csv
+import glob
+import itertools
+import os
+import numpy as np
 import pandas as pd
+from data_schema import (
+    INTEGER,
+    STRING,
+    apply_schema,
+    report_losses,
+    split_dtypes,
+    stream_dtypes,
+)
+from config import SPLIT_CODEC, SPLIT_DATA
 
+PREAMBLE_ROWS = 30
+HEADER_ROWS = {"fin": 26, "adc": 28, "wind": 29}
+RECORD_TAGS = {b"$ADC1": "adc", b"$Fin-2": "fin", b"$CWIP_WIND": "wind"}
+DATETIME_FORMAT = "%Y_%m_%d_%H_%M_%S.%f"
+DATETIME_WIDTH = 26  # e.g. 2025_04_29_05_16_54.123456
+DATETIME_FIELDS = [(0, 4), (5, 7), (8, 10), (11, 13), (14, 16), (17, 19)]
+DATETIME_SEPARATORS = {4: "_", 7: "_", 10: "_", 13: "_", 16: "_", 19: "."}
+SPLIT_EXTENSIONS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",  # csv compression is given by the extension
+    "csv.zst": ".csv.zst",  # needs the zstandard package
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+COLUMNAR_FORMATS = ["parquet", "feather"]
+# Parquet row group size, about an hour of 1 Hz records, so that time range
+# filters skip the row groups outside the range instead of decoding them
+ROW_GROUP_ROWS = 3600
 
-def read_col_names(fname, row=26):
-    header = pd.read_csv(fname, header=None, skiprows=row, nrows=1, sep=",")
-    header = header.dropna(axis=1)
-    header_list = header.values[0]
-    return header_list
 
+METADATA_ROWS = [range(0, 4), range(20, 25)]
+CAL_PARAMS_ROWS = range(4, 20)
 
-def read_metadata_partial(fname):
-    df1 = pd.read_csv(fname, header=None, nrows=4, sep=":")
-    df2 = pd.read_csv(fname, header=None, skiprows=20, nrows=5, sep=",")
-    metadata = pd.concat([df1, df2])
-    metadata.reset_index(drop=True, inplace=True)
-    return metadata
 
+class HeaderBlock:
+    """Preamble of a raw CWIP file: metadata, calibration parameters
+    and the column names of each stream."""
 
-def read_cal_params(fname):
-    cal_params = pd.read_csv(fname, header=None, skiprows=4, nrows=16, sep=",")
+    def __init__(self, metadata, cal_params, headers):
+        self.metadata = metadata
+        self.cal_params = cal_params
+        self.headers = headers
+
+    def metadata_wide(self):
+        """Metadata and cal params as a single row, one column per value"""
+        metadata = pd.DataFrame([self.metadata])
+        cal_params_wide = widden_cal_params(self.cal_params)
+        return pd.concat([metadata, cal_params_wide], axis=1)
+
+
+def to_numeric_if_possible(col):
+    try:
+        return pd.to_numeric(col)
+    except (ValueError, TypeError):
+        return col
+
+
+def parse_header_block(preamble):
+    """Parses the preamble text of a raw CWIP file into a HeaderBlock"""
+    lines = preamble.splitlines()
+    metadata = {}
+    for row in itertools.chain(*METADATA_ROWS):
+        sep = ":" if row < 4 else ","
+        key, value = lines[row].split(sep, 1)
+        metadata[key] = value.split(sep)[0] if sep == "," else value
+
+    cal_rows = list(csv.reader(lines[row] for row in CAL_PARAMS_ROWS))
+    cal_params = pd.DataFrame(cal_rows).replace("", None)
+    cal_params = cal_params.apply(to_numeric_if_possible)
     cal_params[0] = cal_params[0].str.replace(" Cal Params", "")
-    return cal_params
 
+    headers = {}
+    for stream, row in HEADER_ROWS.items():
+        fields = next(csv.reader([lines[row]]))
+        headers[stream] = [field for field in fields if field != ""]
+    return HeaderBlock(metadata, cal_params, headers)
+
+
+def read_preamble(f):
+    """Reads the preamble lines from a raw file opened in binary mode,
+    leaving the file positioned at the first data line."""
+    return b"".join(itertools.islice(f, PREAMBLE_ROWS)).decode()
+
+
+def read_header_block(fname):
+    """Reads only the preamble of a raw CWIP file"""
+    with open(fname, "rb") as f:
+        return parse_header_block(read_preamble(f))
+
+
+def read_metadata(fname):
+    """Reads the metadata and cal params of a raw CWIP file as one row,
+    without touching the data records."""
+    return read_header_block(fname).metadata_wide()
+
+
+def datetime_field(digits, start, stop):
+    weights = 10 ** np.arange(stop - start - 1, -1, -1)
+    return digits[:, start:stop] @ weights
+
+
+def decode_cwip_datetimes(values, fname=""):
+    """Decodes fixed width %Y_%m_%d_%H_%M_%S.%f timestamps by slicing the
+    bytes into integer fields. Malformed rows fall back to pd.to_datetime
+    (NaT if that fails too) and are reported."""
+    values = np.asarray(values, dtype=object)
+    width = DATETIME_WIDTH + 1  # one extra byte catches overlong values
+    try:
+        raw = values.astype(f"S{width}")
+    except UnicodeEncodeError:
+        raw = np.zeros(len(values), dtype=f"S{width}")
+    chars = raw.view(np.uint8).reshape(len(values), width)
+    digits = chars.astype(np.int64) - ord("0")
+    is_digit = (digits >= 0) & (digits <= 9)
 
-def cols_to_numeric(df, exclude_cols=[]):
-    for i, col in enumerate(df.columns):
-        if i not in exclude_cols:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    valid = np.ones(len(values), dtype=bool)
+    for pos, sep in DATETIME_SEPARATORS.items():
+        valid &= chars[:, pos] == ord(sep)
+    fields = []
+    for start, stop in DATETIME_FIELDS:
+        valid &= is_digit[:, start:stop].all(axis=1)
+        fields.append(datetime_field(digits, start, stop))
+    year, month, day, hour, minute, second = fields
+    frac_len = np.cumprod(is_digit[:, 20:], axis=1).sum(axis=1)
+    valid &= (frac_len >= 1) & (frac_len <= 6)
+    valid &= chars[np.arange(len(values)), 20 + np.minimum(frac_len, 6)] == 0
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    valid &= (hour < 24) & (minute < 60) & (second < 60)
 
+    frac = np.where(np.arange(6) < frac_len[:, None], digits[:, 20:26], 0)
+    frac_ns = frac @ 10 ** np.arange(8, 2, -1)
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0)
+    months = months.astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + np.where(valid, day - 1, 0)
+    valid &= days.astype("datetime64[M]") == months  # e.g. 31st of April
+    seconds = (hour * 60 + minute) * 60 + second
+    offsets = np.where(valid, seconds * 10**9 + frac_ns, 0)
+    result = days.astype("datetime64[ns]") + offsets.astype("timedelta64[ns]")
 
-def datetime_col_to_index(df):
-    df[0] = pd.to_datetime(df[0], format="%Y_%m_%d_%H_%M_%S.%f")
+    malformed = np.flatnonzero(~valid)
+    if len(malformed) > 0:
+        parsed = pd.to_datetime(
+            values[malformed], format=DATETIME_FORMAT, errors="coerce"
+        )
+        result[malformed] = parsed.values
+        samples = ", ".join(str(value) for value in values[malformed][:3])
+        print(
+            f"Note: {len(malformed)} malformed timestamps, "
+            f"{parsed.isna().sum()} set to NaT {fname} (e.g. {samples})"
+        )
+    return pd.DatetimeIndex(result)
+
+
+def datetime_col_to_index(df, fname=""):
+    df[0] = decode_cwip_datetimes(df[0].values, fname)
     df.set_index(0, inplace=True)
     df.index.name = "datetime"
 
@@ -37,30 +167,33 @@ def datetime_col_to_index(df):
 def select_adc(df, header, to_numeric):
     adc = df[df[1] == "$ADC1"]
     adc = adc.iloc[:, : len(header) + 1]
-    if to_numeric:
-        cols_to_numeric(adc, exclude_cols=[0, 1, 5, 6, len(header)])
     datetime_col_to_index(adc)
     adc.columns = header
+    if to_numeric:
+        adc, losses = apply_schema(adc, "adc")
+        report_losses(losses, "adc")
     return adc
 
 
 def select_fin(df, header, to_numeric):
     fin = df[df[1] == "$Fin-2"]
     fin = fin.iloc[:, : len(header) + 1]
-    if to_numeric:
-        cols_to_numeric(fin, exclude_cols=[0, 1])
     datetime_col_to_index(fin)
     fin.columns = header
+    if to_numeric:
+        fin, losses = apply_schema(fin, "fin")
+        report_losses(losses, "fin")
     return fin
 
 
 def select_wind(df, header, to_numeric):
     wind = df[df[1] == "$CWIP_WIND"]
     wind = wind.iloc[:, : len(header) + 1]
-    if to_numeric:
-        cols_to_numeric(wind, exclude_cols=[0, 1])
     datetime_col_to_index(wind)
     wind.columns = header
+    if to_numeric:
+        wind, losses = apply_schema(wind, "wind")
+        report_losses(losses, "wind")
     return wind
 
 
@@ -79,32 +212,284 @@ def read_cwip_components(fname, to_numeric=False):
     raw_data = pd.read_csv(
         fname, header=None, names=list(range(69)), low_memory=False
     )
+    header_block = read_header_block(fname)
 
-    adc_header = read_col_names(fname, row=28)
-    adc = select_adc(raw_data, adc_header, to_numeric)
+    adc = select_adc(raw_data, header_block.headers["adc"], to_numeric)
+    fin = select_fin(raw_data, header_block.headers["fin"], to_numeric)
+    wind = select_wind(raw_data, header_block.headers["wind"], to_numeric)
 
-    fin_header = read_col_names(fname, row=26)
-    fin = select_fin(raw_data, fin_header, to_numeric)
+    return adc, wind, fin, header_block.metadata_wide()
 
-    wind_header = read_col_names(fname, row=29)
-    wind = select_wind(raw_data, wind_header, to_numeric)
 
-    metadata_partial = read_metadata_partial(fname)
-    metadata_partial_wide = metadata_partial.set_index(0).T.reset_index(
-        drop=True
+def route_records(lines, buffers, widths):
+    """Appends each raw line to the buffer of the stream named by its tag,
+    cut to the width of the stream: the datetime and its header columns.
+    Lines with unknown tags (preamble, other instruments) are dropped."""
+    for line in lines:
+        fields = line.split(b",", 2)
+        if len(fields) > 1:
+            stream = RECORD_TAGS.get(fields[1].strip())
+            if stream in widths:
+                fields = line.rstrip(b"\r\n").split(b",", widths[stream])
+                buffers[stream].write(b",".join(fields[: widths[stream]]))
+                buffers[stream].write(b"\n")
+
+
+def parse_stream(stream, buffer, header, fname=""):
+    """Parses the routed lines of one stream into a DataFrame typed by the
+    stream schema, with the same layout as select_adc/select_fin/select_wind.
+    """
+    ncols = len(header) + 1
+    dtypes = stream_dtypes(stream, header)
+    text_cols = [0] + [  # integers as text, NaN would make them float64
+        i
+        for i, col in enumerate(header, start=1)
+        if dtypes[col] in [STRING, INTEGER]
+    ]
+    if buffer.tell() == 0:
+        empty = pd.DataFrame(columns=header)
+        empty.index = pd.DatetimeIndex([], name="datetime")
+        return empty
+    buffer.seek(0)
+    df = pd.read_csv(
+        buffer,
+        header=None,
+        names=range(ncols),
+        dtype={i: str for i in text_cols},
+        low_memory=False,
     )
+    datetime_col_to_index(df, fname)
+    df.columns = header
+    df, losses = apply_schema(df, stream)
+    report_losses(losses, stream, fname)
+    return df
+
+
+def parse_records(lines, headers, fname="", streams=None):
+    """Routes raw lines by tag and parses them.
+    Returns a dict of typed ADC, FIN and WIND DataFrames, or of the given
+    streams only, the lines of the others are dropped unparsed."""
+    if streams is not None:
+        headers = {stream: headers[stream] for stream in streams}
+    buffers = {stream: io.BytesIO() for stream in headers}
+    widths = {stream: len(header) + 1 for stream, header in headers.items()}
+    route_records(lines, buffers, widths)
+    return {
+        stream: parse_stream(stream, buffers.pop(stream), header, fname)
+        for stream, header in headers.items()
+    }
+
+
+def read_cwip_single_pass(fname):
+    """Reads raw CWIP files in a single pass over the file.
+    Records are routed by tag to per-stream buffers and parsed to typed
+    columns directly. Returns ADC, WIND, FIN and metadata components."""
+    with open(fname, "rb") as f:
+        header_block = parse_header_block(read_preamble(f))
+        parts = parse_records(f, header_block.headers, fname)
+    metadata_wide = header_block.metadata_wide()
+    return parts["adc"], parts["wind"], parts["fin"], metadata_wide
+
+
+def read_cwip_chunks(fname, chunk_lines=100_000, streams=None):
+    """Reads raw CWIP files in blocks of lines with bounded memory.
+    Returns the metadata and a generator of dicts with the typed ADC, FIN
+    and WIND records of each block, or of the given streams only."""
+    f = open(fname, "rb")
+    header_block = parse_header_block(read_preamble(f))
+
+    def chunks():
+        with f:
+            while True:
+                lines = list(itertools.islice(f, chunk_lines))
+                if not lines:
+                    break
+                yield parse_records(
+                    lines, header_block.headers, fname, streams
+                )
+
+    return header_block.metadata_wide(), chunks()
+
+
+def split_format(fname):
+    for fmt, extension in SPLIT_EXTENSIONS.items():
+        if fname.endswith(extension):
+            return fmt
+    raise ValueError(f"Unknown split format: {fname}")
+
+
+def split_stream(fname):
+    """Returns the stream (adc, fin, wind) of a split file name.
+    Hidden temp files of data_split_raw have the stream of their output."""
+    stem = os.path.basename(fname).lstrip(".").split(".")[0]
+    return stem.split("_")[-1]
+
+
+def split_files(part, split_dir=SPLIT_DATA):
+    """Returns split files of a part (adc, fin, wind) in any split format"""
+    files = []
+    for extension in SPLIT_EXTENSIONS.values():
+        files += glob.glob(f"{split_dir}/**/*{part}{extension}", recursive=True)
+    return sorted(files)
+
+
+def flight_part(flight_dir, part):
+    """Returns the split file of a part in a flight directory"""
+    return split_files(part, split_dir=flight_dir)[0]
+
+
+def to_split_schema(df, stream):
+    """Fixed schema for columnar split files: the declared float dtypes of
+    the stream schema, categorical aircraft/period and string columns."""
+    df, _ = apply_schema(df, stream)
+    for col, dtype in stream_dtypes(stream, df.columns).items():
+        if dtype == "category":
+            df[col] = df[col].astype("category")
+        elif dtype == STRING:
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df
+
+
+def codec_options(codec):
+    """Compression argument of the columnar writers, library default if
+    codec is None"""
+    return {} if codec is None else {"compression": codec}
+
+
+def write_split(df, fname, stream, codec=SPLIT_CODEC):
+    """Writes a split part in the format given by the file extension.
+    codec selects the compression of parquet and feather files."""
+    fmt = split_format(fname)
+    if fmt == "parquet":
+        df = to_split_schema(df, stream)
+        df.to_parquet(
+            fname,
+            index=True,
+            row_group_size=ROW_GROUP_ROWS,
+            **codec_options(codec),
+        )
+    elif fmt == "feather":
+        df = to_split_schema(df, stream).reset_index()
+        df.to_feather(fname, **codec_options(codec))
+    else:
+        df.to_csv(fname, index=True)
+
+
+def time_mask(times, start=None, end=None):
+    """Boolean mask of times within start and end, both inclusive"""
+    mask = np.ones(len(times), dtype=bool)
+    if start is not None:
+        mask &= np.asarray(times >= pd.Timestamp(start))
+    if end is not None:
+        mask &= np.asarray(times <= pd.Timestamp(end))
+    return mask
+
+
+def csv_row_range(fname, start=None, end=None):
+    """Returns the first data row and the number of rows of a csv split
+    part that span start to end, parsing only the datetime column."""
+    times = pd.read_csv(fname, usecols=["datetime"], parse_dates=["datetime"])
+    rows = np.flatnonzero(time_mask(times["datetime"], start, end))
+    if len(rows) == 0:
+        return 0, 0
+    return rows[0], rows[-1] - rows[0] + 1
+
+
+def read_split(fname, columns=None, start=None, end=None):
+    """Reads a split part (adc, fin, wind) in any split format.
+    Only the requested columns and the records from start to end are read:
+    parquet row groups are filtered by the reader, csv rows outside the
+    range are skipped after a pass over the datetime column."""
+    fmt = split_format(fname)
+    in_range = start is not None or end is not None
+    if fmt == "parquet":
+        filters = []
+        if start is not None:
+            filters.append(("datetime", ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append(("datetime", "<=", pd.Timestamp(end)))
+        return pd.read_parquet(fname, columns=columns, filters=filters or None)
+    if fmt == "feather":
+        if columns is not None:
+            columns = ["datetime"] + list(columns)
+        df = pd.read_feather(fname, columns=columns).set_index("datetime")
+        return df[time_mask(df.index, start, end)] if in_range else df
+    usecols = None if columns is None else ["datetime"] + list(columns)
+    skiprows, nrows = None, None
+    if in_range:
+        first, nrows = csv_row_range(fname, start, end)
+        skiprows = range(1, first + 1)
+    df = pd.read_csv(
+        fname,
+        parse_dates=True,
+        index_col="datetime",
+        usecols=usecols,
+        dtype=split_dtypes(split_stream(fname)),
+        skiprows=skiprows,
+        nrows=nrows,
+    )
+    if nrows == 0:  # no records in range, the index is not parsed
+        df.index = pd.DatetimeIndex([], name="datetime")
+    if columns is not None:
+        df = df[list(columns)]
+    if in_range:  # rows are time ordered, unless the clock jumped
+        df = df[time_mask(df.index, start, end)]
+    return df
+
+
+def merge_fin_wind(fin, wind):
+    """Aligns fin and wind records on whole seconds (outer join).
+    The wind tag column and fin columns repeated in wind (aircraft, period)
+    are dropped, so the fin tag stays first and the wind columns last."""
+    fin = clean_wind_index(fin.copy())
+    wind = clean_wind_index(wind.iloc[:, 1:].copy())
+    fin = fin.drop(columns=fin.columns.intersection(wind.columns))
+    return pd.concat([fin, wind], axis=1)
+
+
+def read_merged(flight_dir, columns=None, start=None, end=None):
+    """Reads the merged 1 Hz fin and wind table of a flight.
+    Flights split before the merged part existed are merged on the fly."""
+    merged_files = split_files("merged", split_dir=flight_dir)
+    if merged_files:
+        return read_split(merged_files[0], columns, start, end)
+    print(f"Note: no merged part in {flight_dir}, merging fin and wind")
+    fin = read_split(flight_part(flight_dir, "fin"))
+    wind = read_split(flight_part(flight_dir, "wind"))
+    merged = merge_fin_wind(fin, wind)
+    return slice_frame(merged, columns, start, end)
+
+
+def read_wind_csv(fname, columns=None, start=None, end=None):
+    """Reads *wind file (csv, parquet or feather).
+    Only the requested columns and seconds from start to end are read."""
+    margin = pd.Timedelta(seconds=1)  # records that round into the range
+    wind = read_split(
+        fname,
+        columns=columns,
+        start=None if start is None else pd.Timestamp(start) - margin,
+        end=None if end is None else pd.Timestamp(end) + margin,
+    )
+    wind = clean_wind_index(wind)
+    return slice_frame(wind, start=start, end=end)
+
 
-    cal_params = read_cal_params(fname)
-    cal_params_wide = widden_cal_params(cal_params)
+def slice_frame(df, columns=None, start=None, end=None):
+    """Selects columns and the seconds from start to end of a frame"""
+    if start is not None or end is not None:
+        df = df[time_mask(df.index, start, end)]
+    if columns is not None:
+        df = df[list(columns)]
+    return df
 
-    metadata_wide = pd.concat([metadata_partial_wide, cal_params_wide], axis=1)
 
-    return adc, wind, fin, metadata_wide
+def stamp_flight(df, aircraft, period):
+    df["aircraft"] = aircraft
+    df["period"] = period
 
 
-def read_wind_csv(fname):
-    """Reads *wind.csv file"""
-    wind = pd.read_csv(fname, parse_dates=True, index_col="datetime")
+def clean_wind_index(wind):
+    """Rounds the index to seconds and drops duplicate seconds"""
     wind.index = wind.index = wind.index.round("s")
     wind = wind[~wind.index.duplicated(keep="first")]
     return wind
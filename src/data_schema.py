@@ -0,0 +1,195 @@
+from collections import namedtuple
+import pandas as pd
+
+Column = namedtuple("Column", ["dtype", "unit", "nullable"])
+
+# Columns not declared below are read as nullable float64.
+# float32 is used where the sensor resolution is well below float32 precision.
+DEFAULT_COLUMN = Column("float64", "", True)
+STRING = "str"
+INTEGER = "Int64"  # nullable, for integers beyond float64 precision
+
+ADC_SCHEMA = {
+    "Time": Column("float64", "s", True),
+    "System ID": Column("float64", "", True),
+    "Update Rate (Hz)": Column("float32", "Hz", True),
+    "DATE": Column(STRING, "", True),
+    "TIME": Column(STRING, "", True),
+    "C0": Column("float32", "cnt", True),
+    "C0F": Column("float32", "flag", True),
+    "C1": Column("float32", "cnt", True),
+    "C1F": Column("float32", "flag", True),
+    "F0": Column("float32", "flag", True),
+    "F1": Column("float32", "flag", True),
+    "F2": Column("float32", "flag", True),
+    "F3": Column("float32", "flag", True),
+    "N_ADC": Column("float32", "", True),
+    **{f"AD{i}": Column("float32", "V", True) for i in range(16)},
+    "CS": Column(STRING, "hex", True),
+}
+
+FIN_SCHEMA = {
+    "Altitude (m)": Column("float64", "m", True),
+    "Ambient Temperature (C)": Column("float32", "C", True),
+    "Man - Acquire (0/1)": Column("float32", "flag", True),
+    "IChecksum (CS)": Column(STRING, "hex", True),
+}
+
+WIND_SCHEMA = {
+    "time": Column("float64", "ms", True),
+    "GPStime [nsec]": Column(INTEGER, "ns", True),
+    "lat [deg]": Column("float64", "deg", True),
+    "lon [deg]": Column("float64", "deg", True),
+    "gps_alt [m]": Column("float64", "m", True),
+    "gps_gs [m/s]": Column("float32", "m/s", True),
+    "gps_track [deg]": Column("float32", "deg", True),
+    "yaw [deg]": Column("float32", "deg", True),
+    "pitch [deg]": Column("float32", "deg", True),
+    "roll [deg]": Column("float32", "deg", True),
+    "vel_x [m/s]": Column("float32", "m/s", True),
+    "vel_y [m/s]": Column("float32", "m/s", True),
+    "vel_z [m/s]": Column("float32", "m/s", True),
+    "vel_down [m/s]": Column("float32", "m/s", True),
+    "accel_x [m/s^2]": Column("float32", "m/s^2", True),
+    "accel_y [m/s^2]": Column("float32", "m/s^2", True),
+    "accel_z [m/s^2]": Column("float32", "m/s^2", True),
+    "accel_down [m/s^2]": Column("float32", "m/s^2", True),
+    "ins_status": Column("float32", "", True),
+    "temp_amb [C]": Column("float32", "C", True),
+    "temp_corr [C]": Column("float32", "C", True),
+    "rh [%]": Column("float32", "%", True),
+    "pres_amb [mb]": Column("float32", "mb", True),
+    "pres_alt [m]": Column("float64", "m", True),
+    "tas [m/s]": Column("float32", "m/s", True),
+    "attack [deg]": Column("float32", "deg", True),
+    "sideslip [deg]": Column("float32", "deg", True),
+    "lwc [g/m^3]": Column("float64", "g/m^3", True),
+    "lwc_dat [g/m^3]": Column("float64", "g/m^3", True),
+    "fin_tmp [C]": Column("float32", "C", True),
+    "wind_spd [m/s]": Column("float32", "m/s", True),
+    "wind_dir [deg]": Column("float32", "deg", True),
+    "wind_u [m/s]": Column("float32", "m/s", True),
+    "wind_v [m/s]": Column("float32", "m/s", True),
+    "wind_w [m/s]": Column("float32", "m/s", True),
+    "mag_dec [deg]": Column("float32", "deg", True),
+    "mag_hdg [deg]": Column("float32", "deg", True),
+    "ss_temp [%]": Column("float32", "%", True),
+    "ss_rh [%]": Column("float32", "%", True),
+    "ss_lwc [%]": Column("float32", "%", True),
+    "ss_updraft [%]": Column("float32", "%", True),
+    "ss_extra1 [%]": Column("float32", "%", True),
+    "ss_extra2 [%]": Column("float32", "%", True),
+    "ss_extra3 [%]": Column("float32", "%", True),
+    "ss_total [%]": Column("float32", "%", True),
+    "ss_status [bits]": Column("float64", "bits", True),
+    "seed-a [cnt]": Column("float64", "cnt", True),
+    "seed-b [cnt]": Column("float64", "cnt", True),
+    "seed-c [flg]": Column("float32", "flag", True),
+    "seed-d [flg]": Column("float32", "flag", True),
+    "Latitude": Column("float64", "deg", True),
+    "Longitude": Column("float64", "deg", True),
+}
+
+# fin and wind records aligned on whole seconds
+MERGED_SCHEMA = {**FIN_SCHEMA, **WIND_SCHEMA}
+
+SCHEMAS = {
+    "adc": ADC_SCHEMA,
+    "fin": FIN_SCHEMA,
+    "wind": WIND_SCHEMA,
+    "merged": MERGED_SCHEMA,
+}
+
+# Columns added by data_split_raw
+SPLIT_SCHEMA = {
+    "aircraft": Column("category", "", False),
+    "period": Column("category", "", False),
+}
+
+
+def column_schema(stream, col, position=None):
+    """Returns the declared Column of a stream header name.
+    The first header column labels the record tag and is always a string."""
+    if position == 0:
+        return Column(STRING, "", False)
+    if col in SPLIT_SCHEMA:
+        return SPLIT_SCHEMA[col]
+    return SCHEMAS[stream].get(col, DEFAULT_COLUMN)
+
+
+def stream_dtypes(stream, header):
+    return {
+        col: column_schema(stream, col, position).dtype
+        for position, col in enumerate(header)
+    }
+
+
+def numeric_dtypes(stream):
+    """Declared numeric dtypes of a stream, for readers that know the column
+    names but not their positions."""
+    return {
+        col: column.dtype
+        for col, column in SCHEMAS[stream].items()
+        if column.dtype != STRING
+    }
+
+
+def split_dtypes(stream):
+    """Dtypes for reading split csv parts: the declared numeric dtypes
+    and the categorical columns added by data_split_raw."""
+    split = {col: column.dtype for col, column in SPLIT_SCHEMA.items()}
+    return {**numeric_dtypes(stream), **split}
+
+
+def schema_table(stream, header):
+    """Returns the schema of a stream header as a table"""
+    rows = [
+        {"column": col, **column_schema(stream, col, position)._asdict()}
+        for position, col in enumerate(header)
+    ]
+    return pd.DataFrame(rows)
+
+
+def coerce_numeric(series, dtypes):
+    """Text to numbers, integer columns to nullable integers without passing
+    through float64"""
+    if dtypes[series.name] == INTEGER:
+        return pd.to_numeric(
+            series, errors="coerce", dtype_backend="numpy_nullable"
+        )
+    return pd.to_numeric(series, errors="coerce")
+
+
+def apply_schema(df, stream):
+    """Converts the columns of a stream to their declared dtypes.
+    Columns that are still text are coerced to numbers in bulk.
+    Returns the typed DataFrame and the values lost to coercion per column,
+    plus the nulls found in non-nullable columns."""
+    dtypes = stream_dtypes(stream, df.columns)
+    numeric = [col for col, dtype in dtypes.items() if dtype != STRING]
+    numeric = [col for col in numeric if dtypes[col] != "category"]
+    text = [
+        col
+        for col in numeric
+        if not pd.api.types.is_numeric_dtype(df[col].dtype)
+    ]
+    losses = pd.Series(0, index=df.columns, dtype="int64")
+    df = df.copy()
+    if text:
+        coerced = df[text].apply(coerce_numeric, dtypes=dtypes)
+        losses[text] = (df[text].notna() & coerced.isna()).sum()
+        df[text] = coerced
+    df = df.astype({col: dtypes[col] for col in numeric})
+    required = [
+        col
+        for position, col in enumerate(df.columns)
+        if not column_schema(stream, col, position).nullable
+    ]
+    losses[required] += df[required].isna().sum()
+    return df, losses[losses > 0]
+
+
+def report_losses(losses, stream, fname=""):
+    if len(losses) > 0:
+        print(f"Note: {stream} values lost to coercion {fname}")
+        print(losses.to_string())
@@ -1,8 +1,49 @@
 from tqdm import tqdm
 import glob
 import os
-from data_readers import read_cwip_components
-from config import RAW_DATA, SPLIT_DATA
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from data_readers import (
+    COLUMNAR_FORMATS,
+    ROW_GROUP_ROWS,
+    SPLIT_EXTENSIONS,
+    codec_options,
+    merge_fin_wind,
+    read_cwip_chunks,
+    read_cwip_single_pass,
+    split_format,
+    split_stream,
+    stamp_flight,
+    to_split_schema,
+    write_split,
+)
+from data_catalog import (
+    CatalogAccumulator,
+    catalog_entry,
+    update_catalog,
+    write_catalog,
+)
+from data_manifest import (
+    changed_files,
+    manifest_entry,
+    read_manifest,
+    remove_outputs,
+    write_manifest,
+)
+from config import (
+    CATALOG,
+    MANIFEST,
+    RAW_DATA,
+    SPLIT_CODEC,
+    SPLIT_DATA,
+    SPLIT_FORMAT,
+)
+
+WORKERS = os.cpu_count()  # set to 1 to split files serially
+INCREMENTAL = True  # only split new or changed raw files
+CHUNK_LINES = None  # e.g. 100_000 to split in blocks of raw lines
+WRITE_THREADS = 4  # parts of a flight written concurrently
 
 
 def create_dest_path(fname, output_dir, period, aircraft):
@@ -16,23 +57,394 @@ def create_dest_path(fname, output_dir, period, aircraft):
     return f"{dest_dir}/cwip_{aircraft}_{date_time}"
 
 
-def parts_to_csv(fname, adc, wind, fin, metadata_wide, output_dir=SPLIT_DATA):
+def temp_path(fname):
+    """Hidden temp file next to an output, with the same stream and
+    extension. Globs of split files skip hidden files."""
+    dest_dir, base_name = os.path.split(fname)
+    extension = SPLIT_EXTENSIONS[split_format(fname)]
+    stem = base_name[: -len(extension)]
+    return os.path.join(dest_dir, f".{stem}.tmp{os.getpid()}{extension}")
+
+
+def write_part(df, fname, part):
+    """Writes one part to the temp file of fname.
+    Returns the temp path and the bytes and seconds taken."""
+    start = time.perf_counter()
+    tmp_file = temp_path(fname)
+    try:
+        if part == "metadata":
+            df.to_csv(tmp_file, index=False)
+        else:
+            write_split(df, tmp_file, part)
+    except Exception:
+        discard_temp([tmp_file])
+        raise
+    seconds = time.perf_counter() - start
+    return tmp_file, {"bytes": os.path.getsize(tmp_file), "seconds": seconds}
+
+
+def discard_temp(tmp_files):
+    for tmp_file in tmp_files:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def commit_parts(tmp_files, outputs):
+    """Renames temp files to their outputs, wind last, so a flight with a
+    wind part has all its parts."""
+    renames = list(zip(tmp_files, outputs))
+    renames.sort(key=lambda pair: split_stream(pair[1]) == "wind")
+    for tmp_file, output in renames:
+        os.replace(tmp_file, output)
+
+
+def write_parts_concurrently(parts, outputs, threads=WRITE_THREADS):
+    """Writes parts (dict of part name to DataFrame) to temp files on a
+    thread pool, then renames them to outputs (dict of part name to path).
+    If any part fails no output is replaced.
+    Returns the bytes and seconds taken by each part."""
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = {
+            part: executor.submit(write_part, df, outputs[part], part)
+            for part, df in parts.items()
+        }
+        results, errors = {}, []
+        for part, future in futures.items():
+            try:
+                results[part] = future.result()
+            except Exception as e:
+                errors.append(e)
+    tmp_files = [tmp_file for tmp_file, _ in results.values()]
+    if errors:
+        discard_temp(tmp_files)
+        raise errors[0]
+    commit_parts(tmp_files, [outputs[part] for part in results])
+    return {part: stats for part, (_, stats) in results.items()}
+
+
+def write_parts(
+    fname,
+    adc,
+    wind,
+    fin,
+    metadata_wide,
+    output_dir=SPLIT_DATA,
+    fmt=SPLIT_FORMAT,
+):
+    """Writes adc, wind and fin parts and the merged fin and wind table
+    in the split format. Metadata is always written as csv.
+    Returns the output paths and the bytes and seconds of each part."""
     period = wind["period"].values[0]
     aircraft = wind["aircraft"].values[0]
     dest_path = create_dest_path(fname, output_dir, period, aircraft)
-    adc.to_csv(f"{dest_path}_adc.csv", index=True)
-    wind.to_csv(f"{dest_path}_wind.csv", index=True)
-    fin.to_csv(f"{dest_path}_fin.csv", index=True)
-    metadata_wide.to_csv(f"{dest_path}_metadata.csv", index=False)
+    extension = SPLIT_EXTENSIONS[fmt]
+    parts = {
+        "adc": adc,
+        "wind": wind,
+        "fin": fin,
+        "merged": merge_fin_wind(fin, wind),
+        "metadata": metadata_wide,
+    }
+    outputs = {part: f"{dest_path}_{part}{extension}" for part in parts}
+    outputs["metadata"] = f"{dest_path}_metadata.csv"
+    writes = write_parts_concurrently(parts, outputs)
+    return list(outputs.values()), writes
+
+
+class PartAppender:
+    """Appends blocks of records to a split part file.
+    Csv files are appended as text, parquet files as row groups.
+    With atomic, records go to a temp file that commit_parts renames."""
+
+    def __init__(self, fname, stream, atomic=False):
+        self.fname = fname
+        self.path = temp_path(fname) if atomic else fname
+        self.stream = stream
+        self.fmt = split_format(fname)
+        if self.fmt == "feather":
+            raise ValueError(f"Cannot append to {self.fmt} files")
+        self.writer = None
+        self.rows = 0
+        self.empty = None
+        self.seconds = 0.0
+
+    def append(self, df):
+        if len(df) == 0:
+            self.empty = df
+            return
+        start = time.perf_counter()
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            df = to_split_schema(df, self.stream)
+            if self.writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=True)
+                self.writer = pq.ParquetWriter(
+                    self.path, table.schema, **codec_options(SPLIT_CODEC)
+                )
+            else:
+                table = pa.Table.from_pandas(
+                    df, schema=self.writer.schema, preserve_index=True
+                )
+            self.writer.write_table(table, row_group_size=ROW_GROUP_ROWS)
+        else:
+            df.to_csv(
+                self.path,
+                mode="a" if self.rows else "w",
+                header=not self.rows,
+                index=True,
+            )
+        self.rows += len(df)
+        self.seconds += time.perf_counter() - start
+
+    def close(self):
+        """Closes the file, writing an empty part if no records came."""
+        start = time.perf_counter()
+        if self.writer is not None:
+            self.writer.close()
+        elif self.rows == 0 and self.empty is not None:
+            write_split(self.empty, self.path, self.stream)
+        self.seconds += time.perf_counter() - start
+
+    def stats(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return {"bytes": size, "seconds": self.seconds}
+
+
+class MergedAppender:
+    """Merges blocks of fin and wind records into the merged part as they
+    come. Raw lines are in time order, so only the records of the latest
+    second seen in either stream may continue in a later block. Those are
+    kept back until then, so a second split across blocks is merged as one
+    row, and a stream that stops sending records holds nothing back."""
+
+    def __init__(self, fname, atomic=False):
+        self.appender = PartAppender(fname, "merged", atomic)
+        self.fname = fname
+        self.path = self.appender.path
+        self.pending = {"fin": None, "wind": None}
+        self.last_second = None
 
+    def append(self, fin, wind):
+        for part, df in [("fin", fin), ("wind", wind)]:
+            if len(df) > 0:
+                second = df.index.max().round("s")
+                if self.last_second is None or second > self.last_second:
+                    self.last_second = second
+            pending = self.pending[part]
+            if pending is not None and len(pending) > 0:
+                df = pd.concat([pending, df])
+            self.pending[part] = df
+        if self.last_second is None:
+            return
+        ready = {}
+        for part, df in self.pending.items():
+            is_ready = df.index.round("s") < self.last_second
+            ready[part] = df[is_ready]
+            self.pending[part] = df[~is_ready]
+        self.appender.append(merge_fin_wind(ready["fin"], ready["wind"]))
 
-files = glob.glob(f"{RAW_DATA}/**/*.csv", recursive=True)
+    def close(self):
+        """Merges the records kept back and closes the file."""
+        if self.pending["fin"] is not None:
+            merged = merge_fin_wind(self.pending["fin"], self.pending["wind"])
+            self.appender.append(merged)
+        self.appender.close()
 
-for fname in tqdm(files):
-    adc, wind, fin, metadata_wide = read_cwip_components(fname)
+    @property
+    def rows(self):
+        return self.appender.rows
+
+    def stats(self):
+        return self.appender.stats()
+
+
+def split_raw_file(
+    fname, output_dir=SPLIT_DATA, fmt=SPLIT_FORMAT, chunk_lines=CHUNK_LINES
+):
+    if chunk_lines:
+        return split_raw_file_chunked(fname, output_dir, fmt, chunk_lines)
+    adc, wind, fin, metadata_wide = read_cwip_single_pass(fname)
     aircraft = metadata_wide["AircraftID"].values[0].strip()
     period = os.path.dirname(fname).split(os.sep)[-2]
     for df in [adc, fin, wind]:
-        df["aircraft"] = aircraft
-        df["period"] = period
-    parts_to_csv(fname, adc, wind, fin, metadata_wide)
+        stamp_flight(df, aircraft, period)
+    outputs, writes = write_parts(
+        fname, adc, wind, fin, metadata_wide, output_dir=output_dir, fmt=fmt
+    )
+    rows = {"adc": len(adc), "fin": len(fin), "wind": len(wind)}
+    entry = catalog_entry(fname, outputs, wind, rows)
+    return {"outputs": outputs, "catalog": entry, "writes": writes}
+
+
+def split_raw_file_chunked(
+    fname, output_dir=SPLIT_DATA, fmt=SPLIT_FORMAT, chunk_lines=100_000
+):
+    """Splits a raw file in blocks of lines, appending each block to the
+    split parts, so peak memory does not depend on the flight length.
+    The catalog entry is built from running values, not kept records.
+    The merged table is built block by block as fin and wind records come.
+    Parts are appended to temp files and renamed once all are complete."""
+    metadata_wide, chunks = read_cwip_chunks(fname, chunk_lines)
+    aircraft = metadata_wide["AircraftID"].values[0].strip()
+    period = os.path.dirname(fname).split(os.sep)[-2]
+    dest_path = create_dest_path(fname, output_dir, period, aircraft)
+    extension = SPLIT_EXTENSIONS[fmt]
+    appenders = {
+        part: PartAppender(f"{dest_path}_{part}{extension}", part, atomic=True)
+        for part in ["adc", "wind", "fin"]
+    }
+    appenders["merged"] = MergedAppender(
+        f"{dest_path}_merged{extension}", atomic=True
+    )
+    tmp_files = [appender.path for appender in appenders.values()]
+    catalog = CatalogAccumulator()
+    try:
+        try:
+            for parts in chunks:
+                for part in ["adc", "wind", "fin"]:
+                    stamp_flight(parts[part], aircraft, period)
+                    appenders[part].append(parts[part])
+                appenders["merged"].append(parts["fin"], parts["wind"])
+                catalog.update(parts["wind"])
+        finally:
+            for appender in appenders.values():
+                appender.close()
+        if appenders["wind"].rows == 0:
+            raise ValueError(f"No wind records in {fname}")
+        writes, outputs = {}, {}
+        for part, appender in appenders.items():
+            writes[part] = appender.stats()
+            outputs[part] = appender.fname
+        outputs["metadata"] = f"{dest_path}_metadata.csv"
+        tmp_file, writes["metadata"] = write_part(
+            metadata_wide, outputs["metadata"], "metadata"
+        )
+        tmp_files.append(tmp_file)
+    except Exception:
+        discard_temp(tmp_files)
+        raise
+    commit_parts(tmp_files, list(outputs.values()))
+    rows = {part: appenders[part].rows for part in ["adc", "fin", "wind"]}
+    outputs = list(outputs.values())
+    entry = catalog.entry(fname, outputs, rows)
+    return {"outputs": outputs, "catalog": entry, "writes": writes}
+
+
+def try_split_raw_file(fname, output_dir=SPLIT_DATA, fmt=SPLIT_FORMAT):
+    """Splits one file. Returns the output paths and catalog entry, and the
+    error message instead of raising, so that a bad file does not stop the
+    rest of the run."""
+    try:
+        return split_raw_file(fname, output_dir=output_dir, fmt=fmt), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def split_raw_files(
+    files, output_dir=SPLIT_DATA, workers=WORKERS, fmt=SPLIT_FORMAT
+):
+    """Splits raw files on a pool of worker processes.
+    Progress is reported in file order. Returns the output paths and
+    catalog entry of each split file and a DataFrame with the files that
+    failed and the reason."""
+    results = {}
+    failures = []
+
+    def collect(fname, result, error):
+        if error:
+            failures.append({"file": fname, "error": error})
+        else:
+            results[fname] = result
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(try_split_raw_file, fname, output_dir, fmt)
+                for fname in files
+            ]
+            for fname, future in tqdm(zip(files, futures), total=len(files)):
+                try:
+                    collect(fname, *future.result())
+                except Exception as e:  # worker process died
+                    collect(fname, None, f"{type(e).__name__}: {e}")
+    else:
+        for fname in tqdm(files):
+            collect(fname, *try_split_raw_file(fname, output_dir, fmt))
+    return results, pd.DataFrame(failures, columns=["file", "error"])
+
+
+def split_incremental(
+    files,
+    output_dir=SPLIT_DATA,
+    workers=WORKERS,
+    fmt=SPLIT_FORMAT,
+    manifest_file=MANIFEST,
+    catalog_file=CATALOG,
+):
+    """Splits only new or changed raw files according to the manifest
+    and removes the outputs of raw files that were deleted.
+    Files split in another format or codec are split again. The flight
+    catalog is updated with the split files."""
+    codec = SPLIT_CODEC if fmt in COLUMNAR_FORMATS else None
+    manifest = read_manifest(manifest_file)
+    changed, deleted = changed_files(files, manifest)
+    changed += [
+        fname
+        for fname in files
+        if fname in manifest
+        and fname not in changed
+        and (
+            manifest[fname].get("format", "csv") != fmt
+            or manifest[fname].get("codec") != codec
+        )
+    ]
+    print(
+        f"{len(changed)} new or changed, {len(deleted)} deleted, "
+        f"{len(files) - len(changed)} unchanged raw files"
+    )
+    for fname in deleted:
+        remove_outputs(manifest.pop(fname)["outputs"])
+    results, failures = split_raw_files(changed, output_dir, workers, fmt)
+    for fname, result in results.items():
+        paths = result["outputs"]
+        if fname in manifest:
+            stale = set(manifest[fname]["outputs"]) - set(paths)
+            remove_outputs(sorted(stale))
+        manifest[fname] = manifest_entry(fname, paths, fmt, codec)
+    write_manifest(manifest, manifest_file)
+    entries = [result["catalog"] for result in results.values()]
+    update_catalog(entries, removed=deleted, catalog_file=catalog_file)
+    return results, failures
+
+
+def write_stats(results):
+    """Total bytes and write seconds per part over split results,
+    with the write throughput in MB/s"""
+    rows = [
+        {"part": part, **stats}
+        for result in results.values()
+        for part, stats in result["writes"].items()
+    ]
+    if not rows:
+        return pd.DataFrame(columns=["bytes", "seconds", "MB/s"])
+    stats = pd.DataFrame(rows).groupby("part").sum()
+    stats["MB/s"] = stats["bytes"] / stats["seconds"] / 1e6
+    return stats
+
+
+if __name__ == "__main__":
+    files = sorted(glob.glob(f"{RAW_DATA}/**/*.csv", recursive=True))
+    if INCREMENTAL:
+        results, failures = split_incremental(files)
+    else:
+        results, failures = split_raw_files(files)
+        entries = [result["catalog"] for result in results.values()]
+        if entries:
+            write_catalog(pd.DataFrame(entries))
+    print(write_stats(results).to_string())
+    if len(failures) > 0:
+        print(f"Failed to split {len(failures)} of {len(files)} files:")
+        print(failures.to_string(index=False))
+        failures.to_csv(f"{SPLIT_DATA}/split_failures.csv", index=False)
@@ -1,19 +1,148 @@
+import os
 import pandas as pd
-import glob
 from tqdm import tqdm
-from data_readers import read_wind_csv
-from utils.summary import calc_summary
-from config import SPLIT_DATA, TABLES
-
-wind_files = glob.glob(f"{SPLIT_DATA}/**/*wind.csv", recursive=True)
-
-summary_list = []
-for fname in tqdm(wind_files):
-    wind = read_wind_csv(fname)
-    file_summary = calc_summary(wind, fname)
-    summary_list.append(file_summary)
-
-summary = pd.concat(summary_list)
-summary.reset_index(drop=True, inplace=True)
-summary = summary.sort_values("date")
-summary.to_csv(f"{TABLES}/summary.csv", index=False)
+from concurrent.futures import ProcessPoolExecutor
+from data_cache import read_wind_cached
+from data_catalog import catalog_files
+from data_manifest import file_hash, file_stat
+from data_readers import clean_wind_index, read_cwip_chunks, stamp_flight
+from utils.summary import (
+    PENETRATION_THRESHOLDS,
+    SummaryAccumulator,
+    calc_summary,
+)
+from config import SUMMARY_CACHE, TABLES
+
+WORKERS = os.cpu_count()  # set to 1 to summarize flights serially
+CACHE_COLUMNS = ["size", "mtime", "sha256", "thresholds"]
+CHUNK_LINES = 100_000  # raw lines per chunk when summarizing raw files
+
+# e.g. np.arange(0.1, 1, 0.05) for a sensitivity analysis
+thresholds = PENETRATION_THRESHOLDS
+
+
+def thresholds_key(thresholds):
+    return ",".join(f"{threshold:g}" for threshold in thresholds)
+
+
+def read_summary_cache(cache_file=SUMMARY_CACHE):
+    """Reads the cached summary rows, one per wind file, with the size,
+    mtime and sha256 of the wind file and the thresholds used."""
+    if not os.path.exists(cache_file):
+        return empty_cache()
+    return pd.read_pickle(cache_file)
+
+
+def empty_cache():
+    return pd.DataFrame(columns=["cwip_file", "date", "start"] + CACHE_COLUMNS)
+
+
+def write_summary_cache(cache, cache_file=SUMMARY_CACHE):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = f"{cache_file}.tmp"
+    cache.to_pickle(tmp_file)
+    os.replace(tmp_file, cache_file)
+
+
+def wind_file_key(fname, cached):
+    """Returns the size, mtime and content hash of a wind file.
+    The file is only hashed when size or mtime differ from the cache."""
+    stat = file_stat(fname)
+    if cached is not None and stat == {
+        "size": cached["size"],
+        "mtime": cached["mtime"],
+    }:
+        return {**stat, "sha256": cached["sha256"]}
+    return {**stat, "sha256": file_hash(fname)}
+
+
+def try_calc_summary(fname, thresholds):
+    """Summarizes one wind file. Returns the error message instead of
+    raising, so that a bad file does not stop the rest of the run."""
+    try:
+        wind = read_wind_cached(fname)
+        return calc_summary(wind, fname, thresholds), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def summarize_raw_file(
+    fname, thresholds=PENETRATION_THRESHOLDS, chunk_lines=CHUNK_LINES
+):
+    """Summarizes a raw CWIP file in blocks of lines, without splitting it
+    or holding the flight in memory. Gives the summary of the split wind
+    file, with records in time order as recorded."""
+    metadata_wide, chunks = read_cwip_chunks(fname, chunk_lines, ["wind"])
+    aircraft = metadata_wide["AircraftID"].values[0].strip()
+    period = os.path.dirname(fname).split(os.sep)[-2]
+    accumulator = SummaryAccumulator(thresholds)
+    for parts in chunks:
+        stamp_flight(parts["wind"], aircraft, period)
+        accumulator.update(accumulator.unseen(clean_wind_index(parts["wind"])))
+    return accumulator.summary(fname)
+
+
+def calc_summaries(files, thresholds, workers=WORKERS):
+    """Summarizes wind files on a pool of worker processes.
+    Returns the summary rows by file and the errors by file."""
+    summaries, errors = {}, {}
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(try_calc_summary, fname, thresholds)
+                for fname in files
+            ]
+            results = [future.result() for future in tqdm(futures)]
+    else:
+        results = [
+            try_calc_summary(fname, thresholds) for fname in tqdm(files)
+        ]
+    for fname, (summary, error) in zip(files, results):
+        if error:
+            errors[fname] = error
+        else:
+            summaries[fname] = summary
+    return summaries, errors
+
+
+def update_summary(
+    wind_files, thresholds, cache_file=SUMMARY_CACHE, workers=WORKERS
+):
+    """Summarizes only new or changed wind files, or all files if the
+    thresholds changed, and merges them with the cached summary rows.
+    Returns the summary table sorted by date."""
+    cache = read_summary_cache(cache_file).set_index("cwip_file", drop=False)
+    key = thresholds_key(thresholds)
+    keys, changed = {}, []
+    for fname in wind_files:
+        cached = cache.loc[fname] if fname in cache.index else None
+        keys[fname] = wind_file_key(fname, cached)
+        if (
+            cached is None
+            or cached["sha256"] != keys[fname]["sha256"]
+            or cached["thresholds"] != key
+        ):
+            changed.append(fname)
+    print(f"{len(changed)} new or changed, {len(wind_files)} wind files")
+    summaries, errors = calc_summaries(changed, thresholds, workers)
+    for fname, error in errors.items():
+        print(f"Note: could not summarize {fname}: {error}")
+    for fname, summary in summaries.items():
+        for col, value in {**keys[fname], "thresholds": key}.items():
+            summary[col] = value
+    rows = []
+    for fname in wind_files:
+        if fname in summaries:
+            rows.append(summaries[fname])
+        elif fname not in changed:
+            rows.append(cache.loc[[fname]])
+    cache = pd.concat(rows, ignore_index=True) if rows else empty_cache()
+    write_summary_cache(cache, cache_file)
+    summary = cache.drop(columns=CACHE_COLUMNS)
+    return summary.sort_values(["date", "start"]).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    wind_files = catalog_files("wind")
+    summary = update_summary(wind_files, thresholds)
+    summary.to_csv(f"{TABLES}/summary.csv", index=False)
@@ -8,7 +8,7 @@ from utils.plotting import SMALL_SIZE, MEDIUM_SIZE
 from utils.utils import select_seed_locations
 from plotting_maps_case_study import plot_flight_track_with_seeds
 
-from data_readers import read_wind_csv
+from data_cache import read_wind_cached
 
 country_reader = Reader("data/shapefiles/KSA/gadm41_SAU_1.shp")
 radar_multirings_reader = Reader(
@@ -26,7 +26,7 @@ wind_file = (
 # wind_file = ("data/split/Spring 2025/CS2/20250429051654/cwip_CS2_20250429051654_wind.csv")
 
 
-wind_df = read_wind_csv(wind_file)
+wind_df = read_wind_cached(wind_file)
 seeds = select_seed_locations(wind_df)
 
 plot_flight_track_with_seeds(wind_df, seeds)
@@ -2,6 +2,7 @@ import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import numpy as np
 from utils.plotting import MEDIUM_SIZE, savefig
+from utils.seeds import seed_events, select_channel_events
 
 
 def plot_hist(df, col, filename=""):
@@ -15,8 +16,9 @@ def plot_hist(df, col, filename=""):
 
 
 def plot_temp_ss_seed_ab(df):
-    seed_a = df[(df["seed-a [cnt]"].diff() > 0)]
-    seed_b = df[(df["seed-b [cnt]"].diff() > 0)]
+    events, _ = seed_events(df)
+    seed_a = select_channel_events(df, events, "seed-a")
+    seed_b = select_channel_events(df, events, "seed-b")
     temp_a = seed_a["Ambient Temperature (C)"]
     temp_b = seed_b["Ambient Temperature (C)"]
     ss_a = seed_a["ss_total [%]"]
@@ -1,6 +1,8 @@
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from utils.plotting import MEDIUM_SIZE, LARGE_SIZE, col_to_label, savefig
+from utils.seeds import seed_events
+from utils.utils import select_seed_locations
 
 
 def plot_flight_timeseries_with_seed_vlines(df, col, seed_locations):
@@ -31,11 +33,14 @@ def add_vlines(ax, lines_df, label_first=False, label="seed-a", color="orange"):
 
 
 def plot_flight_multi_timeseries_with_vlines(
-    df, seed_locations, penetrations="", title="", filename=""
+    df, seed_locations, penetrations="", title="", filename="", events=None
 ):
-
-    seed_a_events = df[df["seed-a [cnt]"].diff() > 0]
-    seed_b_events = df[df["seed-b [cnt]"].diff() > 0]
+    """events is the seed_events table of the flight, extracted from df
+    if not given"""
+    if events is None:
+        events, _ = seed_events(df)
+    seed_a_events = events[events["channel"] == "seed-a"]
+    seed_b_events = events[events["channel"] == "seed-b"]
 
     plt.rc("font", size=MEDIUM_SIZE)
     fig, axes = plt.subplots(3, 1, figsize=(18, 9), sharex=True)
@@ -149,14 +154,13 @@ def plot_flight_multi_timeseries_with_vlines(
 
 def plot_day_timeseries_with_seed_vlines(df, col):
     last_column = df.iloc[:, -1]  # last column is named aircraft
-    seed_by_plane = [group for _, group in df.groupby(last_column)]
+    seed_by_plane = [
+        group for _, group in df.groupby(last_column, observed=True)
+    ]
 
     fig, ax = plt.subplots(figsize=(10, 4))
     for plane in seed_by_plane:
-        seed_locations = plane[
-            (plane["seed-a [cnt]"].diff() > 0)
-            | (plane["seed-b [cnt]"].diff() > 0)
-        ]
+        seed_locations = select_seed_locations(plane)
         aircraft = plane.iloc[:, -1].values[0]
         (line,) = ax.plot(plane[col], label=aircraft)
         if len(seed_locations) > 0:
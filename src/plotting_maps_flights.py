@@ -3,6 +3,7 @@ import cartopy.crs as ccrs
 from cartopy.feature import ShapelyFeature
 import matplotlib.patheffects as pe
 from utils.plotting import MEDIUM_SIZE, SMALL_SIZE, savefig
+from utils.seeds import seed_events
 from plotting_maps import (
     plot_plane_track,
     plot_seeds,
@@ -55,9 +56,16 @@ def plot_flight_3d_colorbar(lat, lon, alt, col):
     plt.show()
 
 
-def plot_plane_track_with_seeds(df, start_timestamp, aircraft, filename=""):
+def plot_plane_track_with_seeds(
+    df, start_timestamp, aircraft, filename="", events=None
+):
+    """events is the seed_events table of the flight, extracted from df
+    if not given. Only events with coordinates are plotted."""
     plt.rc("font", size=MEDIUM_SIZE)
     df = df.dropna(subset=["lon [deg]", "lat [deg]"])
+    if events is None:
+        events, _ = seed_events(df)
+    events = events.dropna(subset=["lon [deg]", "lat [deg]"])
 
     fig = plt.figure(figsize=(14, 5))
     gs = fig.add_gridspec(1, 2, width_ratios=[1, 1])
@@ -97,8 +105,8 @@ def plot_plane_track_with_seeds(df, start_timestamp, aircraft, filename=""):
     plot_plane_track(df, ax2)
     plot_start_stop(df, ax2)
 
-    seed_a_events = df[df["seed-a [cnt]"].diff() > 0]
-    seed_b_events = df[df["seed-b [cnt]"].diff() > 0]
+    seed_a_events = events[events["channel"] == "seed-a"]
+    seed_b_events = events[events["channel"] == "seed-b"]
 
     plot_seeds(
         seed_a_events,
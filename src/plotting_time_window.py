@@ -104,6 +104,31 @@ def plot_boxplot_by_relative_time(
     plt.show()
 
 
+def plot_epoch_boxplot_by_relative_time(
+    aggregator,
+    col,
+    title="",
+    filename="",
+    xlabel="Time relative to seed event (s)",
+):
+    """Boxplots by relative time from the sketches of an EpochAggregator,
+    as plot_boxplot_by_relative_time draws them from all the windows"""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    plt.rc("font", size=MEDIUM_SIZE)
+    ax.bxp(
+        aggregator.boxplot_stats(col),
+        showfliers=False,
+        patch_artist=True,
+        boxprops={"facecolor": "tab:blue"},
+        medianprops={"color": "k"},
+    )
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(col_to_label(col))
+    ax.set_title(title)
+    savefig(filename)
+    plt.show()
+
+
 def plot_flight_timeseries_lwc_diff(df, threshold):
     plt.figure(figsize=(12, 4))
     df["lwc [g/m^3]"].plot(label="LWC")
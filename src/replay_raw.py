@@ -0,0 +1,48 @@
+import sys
+import time
+from datetime import datetime
+from data_readers import DATETIME_FORMAT, PREAMBLE_ROWS
+
+SPEED = 1.0  # 2.0 replays twice as fast as recorded
+SPLIT_LINES = True  # write each line in two halves to test partial reads
+
+
+def record_time(line):
+    """Returns the timestamp of a raw data line, None if it has none"""
+    field = line.split(b",", 1)[0].decode()
+    try:
+        return datetime.strptime(field, DATETIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def replay_raw(src, dest, speed=SPEED, split_lines=SPLIT_LINES):
+    """Writes a raw CWIP file to dest line by line at the recorded rate,
+    to test following a file while it is being recorded."""
+    with open(src, "rb") as f_in, open(dest, "wb") as f_out:
+        for _ in range(PREAMBLE_ROWS):
+            f_out.write(f_in.readline())
+        f_out.flush()
+        first_record = None
+        start = time.monotonic()
+        for line in f_in:
+            timestamp = record_time(line)
+            if timestamp is not None:
+                if first_record is None:
+                    first_record = timestamp
+                offset = (timestamp - first_record).total_seconds() / speed
+                time.sleep(max(0, start + offset - time.monotonic()))
+            if split_lines:
+                half = len(line) // 2
+                f_out.write(line[:half])
+                f_out.flush()
+                line = line[half:]
+            f_out.write(line)
+            f_out.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python replay_raw.py <raw CWIP file> <destination>")
+        sys.exit(1)
+    replay_raw(sys.argv[1], sys.argv[2])
@@ -1,6 +1,5 @@
-import glob
-import pandas as pd
-from data_readers import read_wind_csv
+from data_cache import print_cache_stats
+from data_dataset import query_dataset
 from utils.utils import select_seed_locations
 from utils.regions import SeparatorLine, classify_regions
 from plotting_calendars import (
@@ -8,15 +7,12 @@ from plotting_calendars import (
     calplot_seed_events,
     calplot_regions_per_day,
 )
-from config import CALPLOTS, SPLIT_DATA
+from config import CALPLOTS
 
-wind_files = glob.glob(f"{SPLIT_DATA}/**/*wind.csv", recursive=True)
+columns = ["lat [deg]", "lon [deg]", "seed-a [cnt]", "seed-b [cnt]", "aircraft"]
+query = {"period": None, "aircraft": None, "date": None}  # None for all
 
-df_list = []
-for wind_file in wind_files:
-    wind = read_wind_csv(wind_file)
-    df_list.append(wind)
-all_wind = pd.concat(df_list)
+all_wind = query_dataset("wind", columns, **query)
 
 sep = SeparatorLine()
 seed_locations = select_seed_locations(all_wind)
@@ -34,3 +30,5 @@ calplot_planes_per_day(
 calplot_regions_per_day(
     wind_classified, filename=f"{CALPLOTS}/calplot_regions.png"
 )
+
+print_cache_stats()
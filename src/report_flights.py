@@ -1,26 +1,29 @@
-import glob
-from data_readers import read_wind_csv
+from data_cache import print_cache_stats, read_wind_cached
+from data_catalog import catalog_files
 from plotting_maps_flights import plot_plane_track_with_seeds
 from plotting_flight_timeseries import (
     plot_flight_multi_timeseries_with_vlines,
 )
-from utils.utils import resample_1s, select_seed_locations
-from config import SPLIT_DATA, MAPS, TIMESERIES
+from utils.seeds import seed_events
+from utils.utils import resample_1s_fast, select_seed_locations
+from config import MAPS, TIMESERIES
 
-wind_files = glob.glob(f"{SPLIT_DATA}/**/*wind.csv", recursive=True)
+wind_files = catalog_files("wind")
 
 
 for wind_file in wind_files:
     print(wind_file)
-    wind = read_wind_csv(wind_file)
+    wind = read_wind_cached(wind_file)
 
-    seed_locations = select_seed_locations(wind)
+    events, _ = seed_events(wind)
+    seed_locations = select_seed_locations(wind, events)
 
-    resampled = resample_1s(wind)
+    resampled = resample_1s_fast(wind)
 
     resampled = resampled[
         resampled["lon [deg]"] > 30
     ]  # Sometimes GPS first location is out of KSA
+    events = events[events["lon [deg]"] > 30]
     if len(resampled) > 0:
         aircraft = resampled["aircraft"].values[0]
         start_timestamp = resampled.index[0]
@@ -29,12 +32,16 @@ for wind_file in wind_files:
             resampled,
             seed_locations,
             filename=f"{TIMESERIES}/{aircraft}_{date_time}.png",
+            events=events,
         )
         plot_plane_track_with_seeds(
             resampled,
             start_timestamp,
             aircraft,
             filename=f"{MAPS}/flights/{aircraft}_{date_time}.png",
+            events=events,
         )
     else:
         print(f"File: {wind_file} contains no values after filtering")
+
+print_cache_stats()
@@ -1,6 +1,4 @@
 import os
-import glob
-import pandas as pd
 from utils.utils import select_seed_locations
 from plotting_maps_regions import (
     plot_map_kde_periods,
@@ -9,18 +7,15 @@ from plotting_maps_regions import (
     plot_map_kde_single_period,
     plot_grid_percentage,
 )
-from data_readers import read_wind_csv
+from data_cache import print_cache_stats
+from data_dataset import query_dataset
 from utils.regions import SeparatorLine, classify_regions
-from config import SPLIT_DATA, MAPS
+from config import MAPS
 
-wind_files = glob.glob(f"{SPLIT_DATA}/**/*wind.csv", recursive=True)
-df_list = []
-for wind_file in wind_files:
-    wind = read_wind_csv(wind_file)
-    period = wind["period"].values[0]
-    df_list.append(wind)
+columns = ["lat [deg]", "lon [deg]", "seed-a [cnt]", "seed-b [cnt]", "period"]
+query = {"period": None, "aircraft": None, "date": None}  # None for all
 
-all_wind = pd.concat(df_list)
+all_wind = query_dataset("wind", columns, has_seeds=True, **query)
 seed_locations = select_seed_locations(all_wind)
 
 sep = SeparatorLine()
@@ -58,3 +53,5 @@ for period in seed_locations["period"].unique():
         title=f"{period}, grid: {grid}",
         filename=f"{MAPS}/grid/map_grid{grid} {period}.png",
     )
+
+print_cache_stats()
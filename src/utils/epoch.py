@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+SKETCH_SIZE = 256  # items per sketch level, rank error about 1/SKETCH_SIZE
+WHISKER_IQR = 1.5  # whiskers as in matplotlib and seaborn boxplots
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch in the manner of KLL. Values are kept in
+    levels of at most k items, an item at level h standing for 2**h values.
+    A full level is sorted and every other item, from a random start, moves
+    up one level, so memory grows with log(n / k) and not with n.
+    Quantiles are exact until the first level fills."""
+
+    def __init__(self, k=SKETCH_SIZE, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compress()
+
+    def merge(self, other):
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.compress()
+
+    def compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                if len(items) % 2:  # keep one so the rest pair up
+                    self.levels[level] = items[-1:]
+                    items = items[:-1]
+                else:
+                    self.levels[level] = np.empty(0)
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                promoted = items[self.rng.integers(2) :: 2]
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+            level += 1
+
+    def items(self):
+        """Retained items in order and the number of values each stands for"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2**h) for h, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], q)
+        items, weights = self.items()
+        ranks = np.cumsum(weights) - weights / 2
+        ranks = ranks / ranks[-1] if ranks[-1] > 0 else ranks
+        return np.interp(q, ranks, items)
+
+    def boxplot_stats(self, label=None):
+        """Box and whisker values for Axes.bxp, like matplotlib boxplots
+        with showfliers=False: whiskers at the furthest values within
+        WHISKER_IQR times the interquartile range of the quartiles"""
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        low = q1 - WHISKER_IQR * (q3 - q1)
+        high = q3 + WHISKER_IQR * (q3 - q1)
+        items, _ = self.items()
+        items = np.concatenate([[self.min], items, [self.max]])
+        within = items[(items >= low) & (items <= high)]
+        return {
+            "label": label,
+            "med": median,
+            "q1": q1,
+            "q3": q3,
+            "whislo": min(within.min(), q1),
+            "whishi": max(within.max(), q3),
+            "fliers": [],
+        }
+
+
+class EpochAggregator:
+    """Superposed epoch analysis over any number of flights, keeping per
+    relative second and variable the count, mean and sum of squared
+    deviations, merged with Chan's formulas, and a QuantileSketch.
+    Memory depends on the window length and variables, not on the events.
+        aggregator = EpochAggregator(
+            window_relative_seconds(window_seconds), columns
+        )
+        for each flight:
+            aggregator.add(
+                window_tensor(wind, events, window_seconds, columns)
+            )
+    """
+
+    def __init__(self, relative_seconds, columns, k=SKETCH_SIZE):
+        self.relative_seconds = np.asarray(relative_seconds)
+        self.columns = list(columns)
+        shape = (len(self.relative_seconds), len(self.columns))
+        self.count = np.zeros(shape, dtype="int64")
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.sketches = [
+            [QuantileSketch(k, seed=i * shape[1] + j) for j in range(shape[1])]
+            for i in range(shape[0])
+        ]
+
+    def add(self, tensor):
+        """Adds the windows of a WindowTensor with the same relative
+        seconds and columns"""
+        if not np.array_equal(tensor.relative_seconds, self.relative_seconds):
+            raise ValueError("Relative seconds differ from the aggregator")
+        if list(tensor.columns) != self.columns:
+            raise ValueError("Columns differ from the aggregator")
+        values = tensor.values
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(valid, values, 0).sum(axis=0) / count
+            m2 = np.where(valid, (values - mean) ** 2, 0).sum(axis=0)
+        self.merge_moments(count, np.nan_to_num(mean), m2)
+        for i, sketches in enumerate(self.sketches):
+            for j, sketch in enumerate(sketches):
+                sketch.update(values[:, i, j])
+
+    def merge(self, other):
+        """Merges the accumulators of another aggregator, e.g. of another
+        period or computed in another process"""
+        self.merge_moments(other.count, other.mean, other.m2)
+        for sketches, other_sketches in zip(self.sketches, other.sketches):
+            for sketch, other_sketch in zip(sketches, other_sketches):
+                sketch.merge(other_sketch)
+
+    def merge_moments(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share = np.where(total > 0, count / total, 0)
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + m2 + delta**2 * self.count * share
+        self.count = total
+
+    def summary(self, col):
+        """Count, mean, std and quantiles of a variable by relative second"""
+        j = self.columns.index(col)
+        count = self.count[:, j]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(self.m2[:, j] / (count - 1))
+        quantiles = np.array(
+            [
+                sketches[j].quantile([0.25, 0.5, 0.75])
+                for sketches in self.sketches
+            ]
+        )
+        return pd.DataFrame(
+            {
+                "count": count,
+                "mean": np.where(count > 0, self.mean[:, j], np.nan),
+                "std": np.where(count > 1, std, np.nan),
+                "min": [sketches[j].min for sketches in self.sketches],
+                "q1": quantiles[:, 0],
+                "median": quantiles[:, 1],
+                "q3": quantiles[:, 2],
+                "max": [sketches[j].max for sketches in self.sketches],
+            },
+            index=pd.Index(self.relative_seconds, name="relative_time"),
+        ).replace([np.inf, -np.inf], np.nan)
+
+    def boxplot_stats(self, col):
+        """Axes.bxp values of a variable for the seconds with data"""
+        j = self.columns.index(col)
+        return [
+            sketches[j].boxplot_stats(label=second)
+            for second, sketches in zip(self.relative_seconds, self.sketches)
+            if sketches[j].count > 0
+        ]
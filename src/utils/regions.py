@@ -1,4 +1,7 @@
 import numpy as np
+import pandas as pd
+
+REGIONS = ["Central", "SW"]
 
 
 class SeparatorLine:
@@ -12,9 +15,7 @@ class SeparatorLine:
 
 
 def classify_regions(df, sep_slope, sep_intercept):
-    df["region"] = np.where(
-        df["lat [deg]"] > sep_slope * df["lon [deg]"] + sep_intercept,
-        "Central",
-        "SW",
-    )
+    is_central = df["lat [deg]"] > sep_slope * df["lon [deg]"] + sep_intercept
+    codes = np.where(is_central, 0, 1)
+    df["region"] = pd.Categorical.from_codes(codes, categories=REGIONS)
     return df
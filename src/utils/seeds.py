@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Seed channels and their counter columns, seed-a is BIP and seed-b ejectable
+SEED_COUNTERS = {"seed-a": "seed-a [cnt]", "seed-b": "seed-b [cnt]"}
+EVENT_COLUMNS = ["lat [deg]", "lon [deg]", "gps_alt [m]"]
+SECOND_NS = 1_000_000_000
+
+
+def float_values(df, col):
+    return df[col].to_numpy(dtype="float64", na_value=np.nan)
+
+
+def seed_events(df, previous=None):
+    """Extracts the seed events of a flight in one pass over each counter.
+    Returns the event table, one row per counter increase, indexed by time:
+        channel     seed-a or seed-b
+        increment   counter increase from the previous record
+        geolocated  increase of 1, 1 s after the previous record, with lat
+                    and lon
+        row         position of the record in df
+    and the EVENT_COLUMNS of df, along with the totals by channel:
+        count       last minus first counter value, None if the counter
+                    has no values
+        events, geolocated, first, last
+    previous is the last record of the preceding chunk of the same flight,
+    so that diffs continue across chunks."""
+    times = df.index.values.astype("int64")
+    one_second = np.zeros(len(df), dtype=bool)
+    one_second[1:] = np.diff(times) == SECOND_NS
+    if previous is not None and len(df) > 0:
+        last_time = previous.index.values.astype("int64")[-1]
+        one_second[0] = times[0] - last_time == SECOND_NS
+    has_coords = np.ones(len(df), dtype=bool)
+    for col in ["lat [deg]", "lon [deg]"]:
+        has_coords &= ~np.isnan(float_values(df, col))
+
+    rows, channels, increments, geolocated = [], [], [], []
+    totals = {}
+    for code, (channel, col) in enumerate(SEED_COUNTERS.items()):
+        if col not in df:
+            values = np.full(len(df), np.nan)
+        else:
+            values = float_values(df, col)
+        last_value = np.nan
+        if previous is not None and col in previous:
+            last_value = float_values(previous, col)[-1]
+        increment = values - np.concatenate([[last_value], values[:-1]])
+        channel_rows = np.flatnonzero(increment > 0)
+        channel_geolocated = (increment == 1) & one_second & has_coords
+        rows.append(channel_rows)
+        channels.append(np.full(len(channel_rows), code))
+        increments.append(increment[channel_rows])
+        geolocated.append(channel_geolocated[channel_rows])
+        counted = values[~np.isnan(values)]
+        first = counted[0] if len(counted) > 0 else None
+        last = counted[-1] if len(counted) > 0 else None
+        totals[channel] = {
+            "count": None if first is None else last - first,
+            "events": len(channel_rows),
+            "geolocated": int(channel_geolocated.sum()),
+            "first": first,
+            "last": last,
+        }
+
+    rows = np.concatenate(rows)
+    order = np.lexsort([np.concatenate(channels), rows])
+    rows = rows[order]
+    events = pd.DataFrame(
+        {
+            "channel": pd.Categorical.from_codes(
+                np.concatenate(channels)[order], categories=list(SEED_COUNTERS)
+            ),
+            "increment": np.concatenate(increments)[order],
+            "geolocated": np.concatenate(geolocated)[order],
+            "row": rows,
+        },
+        index=df.index[rows],
+    )
+    for col in df.columns.intersection(EVENT_COLUMNS):
+        events[col] = df[col].values[rows]
+    return events, totals
+
+
+def event_rows(events, channel=None):
+    """Positions of the records with seed events, of one channel or any"""
+    if channel is not None:
+        events = events[events["channel"] == channel]
+    return np.unique(events["row"].values)
+
+
+def select_channel_events(df, events, channel):
+    """Records of df with a counter increase of the channel"""
+    return df.iloc[event_rows(events, channel)]
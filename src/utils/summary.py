@@ -1,6 +1,12 @@
+import numpy as np
 import pandas as pd
-from utils.utils import resample_1s, select_cloud_penetrations
-from data_quality_control import is_geolocated
+from utils.seeds import SEED_COUNTERS, event_rows, float_values, seed_events
+from utils.utils import count_over_thresholds
+
+# LWC diff thresholds (g/m^3) of the penetration counts in the summary
+PENETRATION_THRESHOLDS = [0.2, 0.25, 0.3, 0.35, 0.4]
+PENETRATION_PREFIX = "penetrations"
+SECOND_NS = 1_000_000_000
 
 
 def format_timedelta(td):
@@ -10,80 +16,198 @@ def format_timedelta(td):
     return text
 
 
-def count_seed_events(df, col):
-    df_not_na = df.dropna(subset=[col])
-    seed_count_first = df_not_na[col].values[0]
-    seed_count_last = df_not_na[col].values[-1]
-    return seed_count_last - seed_count_first
-
-
-def calc_summary(df, fname):
-    period = df["period"].iloc[0]
-    aircraft = df["aircraft"].iloc[0].strip()
-
-    start = df.index[0]
-    end = df.index[-1]
-    start_time = start.time()
-    end_time = end.time()
-
-    date = start.date()
-
-    duration = end - start  # it is not flight time or air time
-
-    resampled_df = resample_1s(df)
-
-    total_seconds = len(resampled_df)
-    missing_seconds = int(resampled_df.isna().all(axis=1).sum())
-    missing_seconds_percentage = missing_seconds / total_seconds * 100
-
-    seed_a = count_seed_events(df, "seed-a [cnt]")
-    seed_b = count_seed_events(df, "seed-b [cnt]")
-    seed_total = seed_a + seed_b
-
-    nan_coords = df[["lat [deg]", "lon [deg]"]].isna().any(axis=1).sum()
-    nan_coords_percentage = nan_coords / len(df) * 100
-
-    seed_a_loc = is_geolocated(df, "seed-a [cnt]").sum()
-    seed_b_loc = is_geolocated(df, "seed-b [cnt]").sum()
-    seed_loc_total = seed_a_loc + seed_b_loc
-
-    seed_a_noloc = seed_a - seed_a_loc
-    seed_b_noloc = seed_b - seed_b_loc
-    seed_noloc_total = seed_a_noloc + seed_b_noloc
-
-    penetrations02 = len(select_cloud_penetrations(df, lwc_threshold=0.2))
-    penetrations025 = len(select_cloud_penetrations(df, lwc_threshold=0.25))
-    penetrations03 = len(select_cloud_penetrations(df, lwc_threshold=0.3))
-    penetrations035 = len(select_cloud_penetrations(df, lwc_threshold=0.35))
-    penetrations04 = len(select_cloud_penetrations(df, lwc_threshold=0.4))
-
-    summary = {
-        "period": period,
-        "aircraft": aircraft,
-        "date": date,
-        "start": start_time,
-        "end": end_time,
-        "duration": format_timedelta(duration),
-        "total_seconds": total_seconds,
-        "missing_seconds": missing_seconds,
-        "missing_seconds_percentage": f"{missing_seconds_percentage:.2f}",
-        "nan_coords": nan_coords,
-        "nan_coords_percentage": f"{nan_coords_percentage:.2f}",
-        "seed_a": seed_a,
-        "seed_b": seed_b,
-        "seed_total": seed_total,
-        "seed_a_loc": seed_a_loc,
-        "seed_b_loc": seed_b_loc,
-        "seed_loc_total": seed_loc_total,
-        "seed_a_noloc": seed_a_noloc,
-        "seed_b_noloc": seed_b_noloc,
-        "seed_noloc_total": seed_noloc_total,
-        "penetrations02": penetrations02,
-        "penetrations025": penetrations025,
-        "penetrations03": penetrations03,
-        "penetrations035": penetrations035,
-        "penetrations04": penetrations04,
-        "cwip_file": fname,
-    }
-    summary_df = pd.DataFrame([summary])
-    return summary_df
+def penetration_column(threshold):
+    """Summary column of a threshold, e.g. 0.25 -> penetrations025"""
+    return PENETRATION_PREFIX + f"{threshold:g}".replace(".", "")
+
+
+def penetration_columns(summary):
+    """Returns the penetration columns of a summary table by threshold"""
+    columns = {}
+    for col in summary.columns:
+        digits = col[len(PENETRATION_PREFIX) :]
+        if col.startswith(PENETRATION_PREFIX) and digits.isdigit():
+            columns[float(f"{digits[0]}.{digits[1:]}")] = col
+    return dict(sorted(columns.items()))
+
+
+class FlightAccumulator:
+    """Running seed and penetration counts of a flight from a stream of wind
+    chunks in time order, shared by the summary and the catalog so both
+    give the same values. The values of the last row are carried over so
+    diffs match those of the full frame. Subclasses extend update."""
+
+    def __init__(self, thresholds=PENETRATION_THRESHOLDS):
+        self.thresholds = thresholds
+        self.seeds = {
+            channel: {"first": None, "last": None, "geolocated": 0}
+            for channel in SEED_COUNTERS
+        }
+        self.seed_events = 0
+        self.last_row = None
+        self.last_lwc = np.nan
+        self.penetrations = np.zeros(len(thresholds), dtype="int64")
+
+    def unseen(self, df):
+        """Drops the first record of a chunk with whole-second times if its
+        second is the last of the previous chunk, as cleaning the full
+        frame would."""
+        if self.last_row is not None and len(df) > 0:
+            if df.index[0] == self.last_row.index[-1]:
+                return df.iloc[1:]
+        return df
+
+    def update(self, df):
+        if len(df) == 0:
+            return
+        events, totals = seed_events(df, self.last_row)
+        for channel, seed in self.seeds.items():
+            if seed["first"] is None:
+                seed["first"] = totals[channel]["first"]
+            if totals[channel]["last"] is not None:
+                seed["last"] = totals[channel]["last"]
+            seed["geolocated"] += totals[channel]["geolocated"]
+        self.seed_events += len(event_rows(events))
+        self.last_row = df.iloc[-1:].copy()
+
+        if "lwc [g/m^3]" in df:
+            lwc = float_values(df, "lwc [g/m^3]")
+            lwc_diff = lwc - previous(lwc, self.last_lwc)
+            self.penetrations += count_over_thresholds(
+                lwc_diff, self.thresholds
+            )
+            self.last_lwc = lwc[-1]
+
+    def seed_count(self, channel):
+        """Last minus first counter value, None if the counter has none"""
+        seed = self.seeds[channel]
+        if seed["first"] is None:
+            return None
+        return int(seed["last"] - seed["first"])
+
+
+class SummaryAccumulator(FlightAccumulator):
+    """Summarizes a flight from a stream of wind chunks in time order,
+    keeping running counts instead of the whole flight.
+        acc = SummaryAccumulator(thresholds)
+        for chunk in chunks:
+            acc.update(chunk)
+        summary_df = acc.summary(fname)"""
+
+    def __init__(self, thresholds=PENETRATION_THRESHOLDS):
+        super().__init__(thresholds)
+        self.rows = 0
+        self.period = self.aircraft = self.start = self.end = None
+        self.first_second = self.last_second = None
+        self.seconds_with_data = 0
+        self.last_second_with_data = None
+        self.nan_coords = 0
+
+    def update(self, df):
+        if len(df) == 0:
+            return
+        if self.rows == 0:
+            self.period = df["period"].iloc[0]
+            self.aircraft = df["aircraft"].iloc[0].strip()
+            self.start = df.index[0]
+        self.end = df.index[-1]
+        self.rows += len(df)
+        times = df.index.values.astype("int64")
+        self.count_seconds(times, df.notna().any(axis=1).values)
+
+        coords = df[["lat [deg]", "lon [deg]"]]
+        self.nan_coords += int(coords.isna().any(axis=1).sum())
+        super().update(df)
+
+    def count_seconds(self, times, has_data):
+        """Counts the seconds resample_1s would give and those with data"""
+        seconds = times // SECOND_NS
+        if self.first_second is None:
+            self.first_second, self.last_second = seconds.min(), seconds.max()
+        self.first_second = min(self.first_second, seconds.min())
+        self.last_second = max(self.last_second, seconds.max())
+        seconds = np.unique(seconds[has_data])
+        if len(seconds) == 0:
+            return
+        self.seconds_with_data += len(seconds)
+        if seconds[0] == self.last_second_with_data:
+            self.seconds_with_data -= 1
+        self.last_second_with_data = seconds[-1]
+
+    def required_seed_count(self, channel):
+        count = self.seed_count(channel)
+        if count is None:
+            raise IndexError(f"No {channel} counts")
+        return count
+
+    def summary(self, fname):
+        if self.rows == 0:
+            raise ValueError(f"No wind records to summarize in {fname}")
+        duration = self.end - self.start  # it is not flight time or air time
+
+        total_seconds = int(self.last_second - self.first_second + 1)
+        missing_seconds = total_seconds - self.seconds_with_data
+        missing_seconds_percentage = missing_seconds / total_seconds * 100
+
+        seed_a = self.required_seed_count("seed-a")
+        seed_b = self.required_seed_count("seed-b")
+        seed_total = seed_a + seed_b
+
+        nan_coords = self.nan_coords
+        nan_coords_percentage = nan_coords / self.rows * 100
+
+        seed_a_loc = self.seeds["seed-a"]["geolocated"]
+        seed_b_loc = self.seeds["seed-b"]["geolocated"]
+        seed_loc_total = seed_a_loc + seed_b_loc
+
+        seed_a_noloc = seed_a - seed_a_loc
+        seed_b_noloc = seed_b - seed_b_loc
+        seed_noloc_total = seed_a_noloc + seed_b_noloc
+
+        summary = {
+            "period": self.period,
+            "aircraft": self.aircraft,
+            "date": self.start.date(),
+            "start": self.start.time(),
+            "end": self.end.time(),
+            "duration": format_timedelta(duration),
+            "total_seconds": total_seconds,
+            "missing_seconds": missing_seconds,
+            "missing_seconds_percentage": f"{missing_seconds_percentage:.2f}",
+            "nan_coords": nan_coords,
+            "nan_coords_percentage": f"{nan_coords_percentage:.2f}",
+            "seed_a": seed_a,
+            "seed_b": seed_b,
+            "seed_total": seed_total,
+            "seed_a_loc": seed_a_loc,
+            "seed_b_loc": seed_b_loc,
+            "seed_loc_total": seed_loc_total,
+            "seed_a_noloc": seed_a_noloc,
+            "seed_b_noloc": seed_b_noloc,
+            "seed_noloc_total": seed_noloc_total,
+            **{
+                penetration_column(threshold): int(count)
+                for threshold, count in zip(self.thresholds, self.penetrations)
+            },
+            "cwip_file": fname,
+        }
+        summary_df = pd.DataFrame([summary])
+        return summary_df
+
+
+def previous(values, last_value):
+    """Values shifted by one row, starting with the last value of the
+    previous chunk, NaN for the first chunk"""
+    return np.concatenate([[last_value], values[:-1]])
+
+
+def calc_summary_chunks(chunks, fname, thresholds=PENETRATION_THRESHOLDS):
+    """Summarizes a flight given as wind chunks in time order"""
+    accumulator = SummaryAccumulator(thresholds)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.summary(fname)
+
+
+def calc_summary(df, fname, thresholds=PENETRATION_THRESHOLDS):
+    return calc_summary_chunks([df], fname, thresholds)
@@ -1,24 +1,134 @@
+import numpy as np
 import pandas as pd
 
 
+def window_bounds(index, center_times, window_timedelta):
+    """Positions of the first and past the last record of each window,
+    the records from center - window/2 to center + window/2 inclusive as
+    in df[start:end], found at once on the sorted index"""
+    centers = center_times.index
+    starts = index.searchsorted(centers - window_timedelta / 2, side="left")
+    ends = index.searchsorted(centers + window_timedelta / 2, side="right")
+    return starts, ends
+
+
+def window_rows(starts, ends):
+    """Row positions of all windows one after the other,
+    and the window of each row"""
+    counts = ends - starts
+    windows = np.repeat(np.arange(len(starts)), counts)
+    first_rows = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return first_rows + np.arange(counts.sum()), windows
+
+
 def select_time_windows(df, center_times, window_timedelta):
+    starts, ends = window_bounds(df.index, center_times, window_timedelta)
     time_windows = []
-    for count, time in enumerate(center_times.index, start=1):
-        start = time - window_timedelta / 2
-        end = time + window_timedelta / 2
-        time_window = df[start:end].copy()
-        time_window["window_count"] = count
-        if not time_window.empty:
-            time_windows.append(time_window)
+    for count, (start, end) in enumerate(zip(starts, ends), start=1):
+        if end > start:
+            time_windows.append(df.iloc[start:end].assign(window_count=count))
     return time_windows
 
 
 def time_windows_to_df(time_windows):
-    time_windows_list = []
-    for count, time_window in enumerate(time_windows):
-        time_window_c = time_window.copy()
-        time_windows_list.append(time_window_c)
-    return pd.concat(time_windows_list)
+    return pd.concat(time_windows)
+
+
+def windows_to_df(df, center_times, window_timedelta):
+    """Same as time_windows_to_df(select_time_windows(...)), taking the
+    rows of all windows from df at once"""
+    starts, ends = window_bounds(df.index, center_times, window_timedelta)
+    rows, windows = window_rows(starts, ends)
+    windows_df = df.iloc[rows]
+    windows_df.insert(len(df.columns), "window_count", windows + 1)
+    return windows_df
+
+
+def relative_offsets(index, rows, center_times, windows):
+    """Whole seconds from the event time of each window to each row"""
+    offsets = index.values[rows] - center_times.index.values[windows]
+    return np.rint(offsets / np.timedelta64(1, "s")).astype("int64")
+
+
+def relative_time_windows(df, center_times, window_timedelta, columns=None):
+    """Stacks the windows around the center times indexed by relative_time,
+    the whole seconds from the event time, like concatenating
+    to_relative_time_index of each window. Rows and columns are taken from
+    df in one step, so only the requested columns of the windows are
+    copied; the record time is kept in a column named after the index."""
+    starts, ends = window_bounds(df.index, center_times, window_timedelta)
+    rows, windows = window_rows(starts, ends)
+    if columns is None:
+        columns = df.columns
+    windows_df = df.iloc[rows, df.columns.get_indexer(columns)]
+    windows_df.insert(0, df.index.name or "index", df.index.values[rows])
+    windows_df.insert(len(windows_df.columns), "window_count", windows + 1)
+    windows_df.index = pd.Index(
+        relative_offsets(df.index, rows, center_times, windows),
+        name="relative_time",
+    )
+    return windows_df
+
+
+def window_relative_seconds(window_seconds):
+    """Whole seconds from the center of a window of window_seconds"""
+    half = window_seconds // 2
+    return np.arange(-half, half + 1)
+
+
+class WindowTensor:
+    """Windows around events as a dense events x relative seconds x
+    variables array, NaN where a window has no record for a second.
+    mask is True where it has one. to_long numbers the windows from 1 in
+    window_count, like windows_to_df."""
+
+    def __init__(self, values, mask, relative_seconds, center_times, columns):
+        self.values = values
+        self.mask = mask
+        self.relative_seconds = relative_seconds
+        self.center_times = center_times
+        self.columns = columns
+
+    def to_long(self):
+        """Long view with one row per record in a window, indexed by
+        relative_time, like the concatenated relative time windows"""
+        windows, slots = np.nonzero(self.mask)
+        long_df = pd.DataFrame(
+            self.values[windows, slots],
+            columns=self.columns,
+            index=pd.Index(self.relative_seconds[slots], name="relative_time"),
+        )
+        long_df.insert(0, "window_count", windows + 1)
+        return long_df
+
+
+def window_tensor(df, center_times, window_seconds, columns=None):
+    """Extracts the windows of window_seconds around each center time,
+    for the numeric columns if none given. Records are placed at their
+    whole second from the center, assuming at most one record per second
+    as in cleaned wind data. Windows without records stay all NaN."""
+    if columns is None:
+        columns = df.select_dtypes(include="number").columns
+    window_timedelta = pd.Timedelta(seconds=window_seconds)
+    starts, ends = window_bounds(df.index, center_times, window_timedelta)
+    rows, windows = window_rows(starts, ends)
+    relative_seconds = window_relative_seconds(window_seconds)
+    half = -relative_seconds[0]
+    slots = relative_offsets(df.index, rows, center_times, windows) + half
+    in_window = (slots >= 0) & (slots < len(relative_seconds))
+    rows, windows = rows[in_window], windows[in_window]
+    slots = slots[in_window]
+
+    shape = (len(center_times), len(relative_seconds), len(columns))
+    values = np.full(shape, np.nan)
+    values[windows, slots] = df[columns].to_numpy(
+        dtype="float64", na_value=np.nan
+    )[rows]
+    mask = np.zeros(shape[:2], dtype=bool)
+    mask[windows, slots] = True
+    return WindowTensor(
+        values, mask, relative_seconds, center_times.index, list(columns)
+    )
 
 
 def to_relative_time_index(df):
@@ -1,4 +1,7 @@
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
+from utils.seeds import event_rows, seed_events
 
 
 def resample_1s(df):
@@ -11,14 +14,149 @@ def resample_1s(df):
     return pd.concat([numeric_resampled, string_resampled], axis=1)
 
 
-def select_seed_locations(df):
-    return df[
-        (df["seed-a [cnt]"].diff() > 0) | (df["seed-b [cnt]"].diff() > 0)
-    ].copy()
+def second_bins(index):
+    """Bins a DatetimeIndex into whole seconds.
+    Returns the bin of each record, counted from the first second, and
+    the 1 s index of all seconds from the first to the last record."""
+    seconds = index.values.astype("datetime64[s]").astype("int64")
+    first = seconds.min()
+    bins = seconds - first
+    seconds_index = pd.date_range(
+        start=pd.Timestamp(first, unit="s", tz=index.tz),
+        periods=bins.max() + 1,
+        freq="s",
+        name=index.name,
+    )
+    return bins, seconds_index
+
+
+def missing_seconds(index):
+    """Index-only resample: the seconds from the first to the last record
+    without any records"""
+    bins, seconds_index = second_bins(index)
+    has_records = np.bincount(bins, minlength=len(seconds_index)) > 0
+    return seconds_index[~has_records]
+
+
+def first_positions(bins, valid, n_bins, order=None):
+    """Position of the first valid record in time of each bin, -1 if none.
+    order sorts the records in time, None if there is one record per bin."""
+    positions = np.full(n_bins, -1)
+    if order is None:
+        positions[bins[valid]] = np.flatnonzero(valid)
+        return positions
+    valid_positions = order[valid[order]]
+    valid_bins, first = np.unique(bins[valid_positions], return_index=True)
+    positions[valid_bins] = valid_positions[first]
+    return positions
+
+
+def mean_dtype(dtype):
+    return "float32" if dtype == "float32" else "float64"
+
+
+def as_mean_dtype(values, dtype):
+    """Means as resample_1s gives them: nullable numbers give Float64"""
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        return pd.array(values, dtype="Float64")
+    return values
+
+
+def resample_1s_fast(df):
+    """Same output as resample_1s, computed on arrays: the index is binned
+    into seconds once, numeric columns are placed directly when there is
+    at most one record per second, otherwise all are averaged together
+    with bincount. The other columns take their first valid value;
+    columns without missing values, e.g. aircraft and period, share the
+    position of the first record of each second."""
+    if len(df) == 0:
+        return resample_1s(df)
+    bins, seconds_index = second_bins(df.index)
+    n_bins = len(seconds_index)
+    one_per_bin = bool(np.all(np.diff(bins) > 0))
+    order = None if one_per_bin else np.argsort(df.index.values, kind="stable")
+    numeric_cols = df.select_dtypes(include="number").columns
+    string_cols = df.columns.difference(numeric_cols, sort=False)
+
+    resampled = {}
+    if one_per_bin:
+        for col in numeric_cols:
+            values = np.full(n_bins, np.nan, dtype=mean_dtype(df[col].dtype))
+            values[bins] = df[col].to_numpy(dtype=values.dtype, na_value=np.nan)
+            resampled[col] = as_mean_dtype(values, df[col].dtype)
+    else:
+        values = df[numeric_cols].to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~np.isnan(values)
+        keys = bins[:, None] * len(numeric_cols) + np.arange(len(numeric_cols))
+        size = n_bins * len(numeric_cols)
+        counts = np.bincount(keys[valid], minlength=size)
+        sums = np.bincount(keys[valid], weights=values[valid], minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = (sums / counts).reshape(n_bins, len(numeric_cols))
+        for i, col in enumerate(numeric_cols):
+            values = means[:, i].astype(mean_dtype(df[col].dtype))
+            resampled[col] = as_mean_dtype(values, df[col].dtype)
+
+    all_records = np.ones(len(df), dtype=bool)
+    first_records = first_positions(bins, all_records, n_bins, order)
+    for col in string_cols:
+        series = df[col]
+        valid = series.notna().values
+        if valid.all():
+            positions = first_records
+        else:
+            positions = first_positions(bins, valid, n_bins, order)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            resampled[col] = series.array.take(positions, allow_fill=True)
+            continue
+        values = series.values.take(np.maximum(positions, 0))
+        values[positions < 0] = None
+        resampled[col] = values
+    return pd.DataFrame(resampled, index=seconds_index)
+
+
+def select_seed_locations(df, events=None):
+    """Records where any seed counter increases. Pass the seed_events
+    table of df if already extracted."""
+    if events is None:
+        events, _ = seed_events(df)
+    return df.iloc[event_rows(events)].copy()
 
 
 def select_cloud_penetrations(df, lwc_threshold=0.3):
     return df[df["lwc [g/m^3]"].diff() > lwc_threshold].copy()
 
+
+def count_over_thresholds(values, thresholds):
+    """Counts the values greater than each threshold in one pass:
+    values are sorted once and every threshold is a binary search.
+    NaN values are not counted."""
+    values = np.asarray(values, dtype="float64")
+    values = np.sort(values[~np.isnan(values)])
+    positions = np.searchsorted(values, thresholds, side="right")
+    return len(values) - positions
+
+
+def count_cloud_penetrations(df, thresholds):
+    """Counts the rows select_cloud_penetrations selects for each threshold,
+    computing the LWC diff once and copying no rows"""
+    return count_over_thresholds(df["lwc [g/m^3]"].diff(), thresholds)
+
 def get_index_middle(df):
-    return df.index[(len(df.index) - 1) // 2]
\ No newline at end of file
+    return df.index[(len(df.index) - 1) // 2]
+
+
+def concat_categorical(dfs):
+    """Concatenates DataFrames keeping categorical columns categorical.
+    pd.concat falls back to object columns when categories differ."""
+    dfs = list(dfs)
+    categorical = dfs[0].select_dtypes(include="category").columns
+    for col in categorical:
+        if not all(col in df and df[col].dtype == "category" for df in dfs):
+            continue
+        categories = union_categoricals([df[col] for df in dfs]).categories
+        dfs = [
+            df.assign(**{col: df[col].cat.set_categories(categories)})
+            for df in dfs
+        ]
+    return pd.concat(dfs)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import data_cache
+from data_readers import read_wind_csv, write_split
+
+
+def test_selected_reads_fill_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        data_cache.cache_file, "__defaults__", (str(tmp_path / "cache"),)
+    )
+    data_cache.clear_cache()
+    fname = str(tmp_path / "f_wind.csv")
+    index = pd.date_range(
+        "2025-04-29", periods=100, freq="s", name="datetime"
+    )
+    wind = pd.DataFrame(
+        {"lat [deg]": np.linspace(20, 21, 100), "lon [deg]": 45.0},
+        index=index,
+    )
+    write_split(wind, fname, "wind")
+    start, end = index[10], index[20]
+    selected = data_cache.read_wind_cached(fname, ["lon [deg]"], start, end)
+    pd.testing.assert_frame_equal(
+        selected, read_wind_csv(fname, ["lon [deg]"], start, end)
+    )
+    data_cache.load_wind.cache_clear()  # as in a later run
+    data_cache.read_wind_cached(fname, ["lat [deg]"])
+    data_cache.read_wind_cached(fname)
+    stats = data_cache.cache_stats()
+    assert stats["misses"] == 1
+    assert stats["disk_hits"] == 1
+    data_cache.clear_cache()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from data_catalog import CatalogAccumulator, catalog_entry
+from utils.summary import calc_summary, calc_summary_chunks
+
+FLIGHT = "/split/Spring 2025/CS02/20250429051654/cwip_CS02_20250429051654"
+OUTPUTS = [
+    f"{FLIGHT}_{part}.csv" for part in ["adc", "wind", "fin", "merged", "metadata"]
+]
+
+
+def flight(seconds=600, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(
+        "2025-04-29 05:16:54.3", periods=seconds, freq="s", name="datetime"
+    )
+    wind = pd.DataFrame(
+        {
+            "lat [deg]": 24 + rng.random(seconds),
+            "lon [deg]": 45 + rng.random(seconds),
+            "gps_alt [m]": 3000.0,
+            "lwc [g/m^3]": rng.random(seconds),
+            "seed-a [cnt]": np.cumsum(rng.random(seconds) < 0.05) + 3.0,
+            "seed-b [cnt]": np.cumsum(rng.random(seconds) < 0.02) * 1.0,
+            "aircraft": "CS02",
+            "period": "Spring 2025",
+        },
+        index=index,
+    )
+    wind.iloc[rng.choice(seconds, 30), :4] = np.nan
+    return wind
+
+
+def test_chunked_catalog_entry_matches_whole_flight():
+    wind = flight()
+    entry = catalog_entry("raw.csv", OUTPUTS, wind, {"wind": len(wind)})
+    accumulator = CatalogAccumulator()
+    for chunk in np.array_split(np.arange(len(wind)), 7):
+        accumulator.update(wind.iloc[chunk])
+    assert accumulator.entry("raw.csv", OUTPUTS, {"wind": len(wind)}) == entry
+
+
+def test_catalog_and_summary_counts_agree():
+    wind = flight(seed=1)
+    wind.index = wind.index.round("s")
+    entry = catalog_entry("raw.csv", OUTPUTS, wind, {"wind": len(wind)})
+    summary = calc_summary(wind, "raw.csv", thresholds=[0.3]).iloc[0]
+    chunks = [wind.iloc[chunk] for chunk in np.array_split(range(600), 5)]
+    chunked = calc_summary_chunks(chunks, "raw.csv", [0.3]).iloc[0]
+    for row in [summary, chunked]:
+        assert entry["seed_a"] == row["seed_a"]
+        assert entry["seed_b"] == row["seed_b"]
+        assert entry["penetrations"] == row["penetrations03"]
@@ -0,0 +1,69 @@
+import io
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from data_readers import (
+    DATETIME_FORMAT,
+    ROW_GROUP_ROWS,
+    decode_cwip_datetimes,
+    parse_stream,
+    read_split,
+    write_split,
+)
+
+
+def wind_records(seconds):
+    index = pd.date_range(
+        "2025-04-29", periods=seconds, freq="s", name="datetime"
+    )
+    return pd.DataFrame(
+        {"lwc [g/m^3]": np.linspace(0, 1, seconds)}, index=index
+    )
+
+
+def test_parquet_parts_have_bounded_row_groups(tmp_path):
+    fname = str(tmp_path / "f_wind.parquet")
+    wind = wind_records(6 * 3600)
+    write_split(wind, fname, "wind")
+    metadata = pq.ParquetFile(fname).metadata
+    assert metadata.num_row_groups == 6
+    assert metadata.row_group(0).num_rows == ROW_GROUP_ROWS
+    start, end = wind.index[4000], wind.index[5000]
+    selected = read_split(fname, start=start, end=end)
+    pd.testing.assert_frame_equal(selected, wind[start:end], check_freq=False)
+
+
+def test_gps_time_is_parsed_without_rounding():
+    header = ["$CWIP_WIND", "time", "GPStime [nsec]", "lat [deg]"]
+    lines = [
+        b"2025_04_29_05_16_54.100000,$CWIP_WIND,1,1429999999123456789,24.1\n",
+        b"2025_04_29_05_16_55.100000,$CWIP_WIND,2,,24.2\n",
+        b"2025_04_29_05_16_56.100000,$CWIP_WIND,3,1429999999123456791,24.3\n",
+    ]
+    buffer = io.BytesIO()
+    buffer.write(b"".join(lines))
+    wind = parse_stream("wind", buffer, header)
+    gps_time = wind["GPStime [nsec]"]
+    assert gps_time.dtype == "Int64"
+    assert gps_time.iloc[0] == 1429999999123456789
+    assert gps_time.isna().iloc[1]
+    assert gps_time.iloc[2] == 1429999999123456791
+
+
+def test_decoder_matches_to_datetime():
+    rng = np.random.default_rng(0)
+    times = pd.Timestamp("2024-02-28 23:59:50") + pd.to_timedelta(
+        np.sort(rng.random(1000)) * 3 * 86400, unit="s"
+    )
+    values = list(times.strftime(DATETIME_FORMAT))
+    values += [
+        "2025_04_31_05_16_54.100000",  # no 31st of April
+        "2025_13_01_05_16_54.100000",
+        "2025_04_29_05_16_54.1",  # short fraction
+        "2025-04-29 05:16:54",
+        "",
+        "not a time",
+    ]
+    values = np.array(values, dtype=object)
+    expected = pd.to_datetime(values, format=DATETIME_FORMAT, errors="coerce")
+    pd.testing.assert_index_equal(decode_cwip_datetimes(values), expected)
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from data_readers import merge_fin_wind, read_split, write_split
+from data_split_raw import MergedAppender
+
+
+def records(tag, seconds, per_second=1):
+    """Records of a stream with per_second records in each of the seconds"""
+    offsets = np.arange(per_second) * 1e9 / per_second
+    times = np.add.outer(np.asarray(seconds) * 1e9, offsets).ravel()
+    index = pd.DatetimeIndex(
+        pd.Timestamp("2025-04-29") + pd.to_timedelta(times), name="datetime"
+    )
+    return pd.DataFrame(
+        {
+            "tag": tag,
+            f"{tag[1:]} [x]": np.arange(len(index), dtype="float64"),
+            "aircraft": "CS2",
+            "period": "Spring 2025",
+        },
+        index=index,
+    )
+
+
+def written(df, path):
+    """df as read back from a split part"""
+    write_split(df, str(path), "merged")
+    return read_split(str(path))
+
+
+def test_merged_appender_matches_whole_merge(tmp_path):
+    fin = records("$Fin-2", range(100), per_second=3)
+    wind = records("$CWIP_WIND", range(100), per_second=2)
+    appender = MergedAppender(str(tmp_path / "f_merged.csv"))
+    cuts = pd.Timestamp("2025-04-29") + pd.to_timedelta(
+        np.arange(0, 112, 11.3), unit="s"
+    )  # seconds split across blocks
+    for start, end in zip(cuts[:-1], cuts[1:]):
+        appender.append(
+            fin[(fin.index >= start) & (fin.index < end)],
+            wind[(wind.index >= start) & (wind.index < end)],
+        )
+    appender.close()
+    merged = read_split(str(tmp_path / "f_merged.csv"))
+    expected = written(merge_fin_wind(fin, wind), tmp_path / "e_merged.csv")
+    pd.testing.assert_frame_equal(merged, expected)
+
+
+def test_merged_appender_holds_back_one_second_when_a_stream_stops(tmp_path):
+    fin = records("$Fin-2", range(100))
+    wind = records("$CWIP_WIND", range(5000))
+    appender = MergedAppender(str(tmp_path / "f_merged.csv"))
+    appender.append(fin, wind[:100])
+    for start in range(100, 5000, 100):
+        appender.append(fin[:0], wind[start : start + 100])
+        assert len(appender.pending["wind"]) <= 1
+        assert len(appender.pending["fin"]) == 0
+    appender.close()
+    assert appender.rows == 5000
+    merged = read_split(str(tmp_path / "f_merged.csv"))
+    expected = written(merge_fin_wind(fin, wind), tmp_path / "e_merged.csv")
+    pd.testing.assert_frame_equal(merged, expected)
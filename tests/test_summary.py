@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_quality_control import is_geolocated
+from utils.summary import calc_summary, calc_summary_chunks, format_timedelta
+from utils.utils import resample_1s, select_cloud_penetrations
+
+
+def baseline_summary(df, fname):
+    """calc_summary as it was before the chunked accumulators"""
+
+    def count_seed_events(col):
+        counts = df[col].dropna().values
+        return counts[-1] - counts[0]
+
+    resampled_df = resample_1s(df)
+    total_seconds = len(resampled_df)
+    missing_seconds = int(resampled_df.isna().all(axis=1).sum())
+    seed_a = count_seed_events("seed-a [cnt]")
+    seed_b = count_seed_events("seed-b [cnt]")
+    nan_coords = df[["lat [deg]", "lon [deg]"]].isna().any(axis=1).sum()
+    seed_a_loc = is_geolocated(df, "seed-a [cnt]").sum()
+    seed_b_loc = is_geolocated(df, "seed-b [cnt]").sum()
+    summary = {
+        "period": df["period"].iloc[0],
+        "aircraft": df["aircraft"].iloc[0].strip(),
+        "date": df.index[0].date(),
+        "start": df.index[0].time(),
+        "end": df.index[-1].time(),
+        "duration": format_timedelta(df.index[-1] - df.index[0]),
+        "total_seconds": total_seconds,
+        "missing_seconds": missing_seconds,
+        "missing_seconds_percentage": (
+            f"{missing_seconds / total_seconds * 100:.2f}"
+        ),
+        "nan_coords": nan_coords,
+        "nan_coords_percentage": f"{nan_coords / len(df) * 100:.2f}",
+        "seed_a": seed_a,
+        "seed_b": seed_b,
+        "seed_total": seed_a + seed_b,
+        "seed_a_loc": seed_a_loc,
+        "seed_b_loc": seed_b_loc,
+        "seed_loc_total": seed_a_loc + seed_b_loc,
+        "seed_a_noloc": seed_a - seed_a_loc,
+        "seed_b_noloc": seed_b - seed_b_loc,
+        "seed_noloc_total": seed_a + seed_b - seed_a_loc - seed_b_loc,
+    }
+    for threshold, name in [
+        (0.2, "02"),
+        (0.25, "025"),
+        (0.3, "03"),
+        (0.35, "035"),
+        (0.4, "04"),
+    ]:
+        penetrations = select_cloud_penetrations(df, lwc_threshold=threshold)
+        summary[f"penetrations{name}"] = len(penetrations)
+    summary["cwip_file"] = fname
+    return pd.DataFrame([summary])
+
+
+def flight(per_second=1, seconds=900, seed=0):
+    rng = np.random.default_rng(seed)
+    n = seconds * per_second
+    index = pd.date_range(
+        "2025-04-29 05:16:54", periods=n, freq=f"{1000 // per_second}ms"
+    )
+    wind = pd.DataFrame(
+        {
+            "lat [deg]": 24 + rng.random(n),
+            "lon [deg]": 45 + rng.random(n),
+            "lwc [g/m^3]": rng.random(n),
+            "seed-a [cnt]": np.cumsum(rng.random(n) < 0.05) + 3.0,
+            "seed-b [cnt]": np.cumsum(rng.random(n) < 0.02) * 1.0,
+            "aircraft": pd.Categorical(["CS02"] * n),
+            "period": pd.Categorical(["Spring 2025"] * n),
+        },
+        index=index.rename("datetime"),
+    )
+    wind.iloc[rng.choice(n, n // 10), :5] = np.nan
+    wind.iloc[rng.choice(n, n // 50), :] = np.nan  # fully empty records
+    wind = wind.drop(wind.index[rng.choice(n, n // 7, replace=False)])
+    return wind.dropna(subset=["aircraft"])
+
+
+@pytest.mark.parametrize("per_second", [1, 4])
+def test_calc_summary_matches_baseline(per_second):
+    wind = flight(per_second)
+    expected = baseline_summary(wind, "f_wind.csv")
+    pd.testing.assert_frame_equal(
+        calc_summary(wind, "f_wind.csv"), expected, check_dtype=False
+    )
+
+
+@pytest.mark.parametrize("size", [1, 7, 100, 10_000])
+def test_calc_summary_chunks_match_whole_flight(size):
+    wind = flight(per_second=2, seconds=300, seed=1)
+    chunks = [wind.iloc[i : i + size] for i in range(0, len(wind), size)]
+    pd.testing.assert_frame_equal(
+        calc_summary_chunks(chunks, "f_wind.csv"),
+        calc_summary(wind, "f_wind.csv"),
+    )
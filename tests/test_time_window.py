@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from utils.time_window import windows_to_df
+
+
+def baseline_windows_df(df, center_times, window_timedelta):
+    """time_windows_to_df(select_time_windows(...)) as it was, one df slice
+    per window"""
+    time_windows = []
+    for count, time in enumerate(center_times.index, start=1):
+        start = time - window_timedelta / 2
+        end = time + window_timedelta / 2
+        time_window = df[start:end].copy()
+        time_window["window_count"] = count
+        if not time_window.empty:
+            time_windows.append(time_window)
+    return pd.concat(time_windows)
+
+
+def test_windows_to_df_matches_window_slices():
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2025-04-29", periods=600, freq="s", name="datetime")
+    gap = index[300:330]
+    index = index.drop(gap.union(index[rng.choice(600, 100, replace=False)]))
+    df = pd.DataFrame(
+        {
+            "lwc [g/m^3]": rng.random(len(index)),
+            "aircraft": pd.Categorical(["CS02"] * len(index)),
+        },
+        index=index,
+    )
+    centers = df.iloc[np.sort(rng.choice(len(df), 40, replace=False))]
+    in_gap = pd.DataFrame(index=gap[[5, 15]])  # windows without records
+    centers = pd.concat([centers, centers.iloc[:2], in_gap]).sort_index()
+    for seconds in [1, 8, 31]:
+        window = pd.Timedelta(seconds=seconds)
+        pd.testing.assert_frame_equal(
+            windows_to_df(df, centers, window),
+            baseline_windows_df(df, centers, window),
+        )
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from utils.utils import resample_1s, resample_1s_fast
+
+
+def records(per_second=1, seconds=120, shuffle=False, seed=0):
+    """Wind-like records with gaps, NaN values and categorical columns"""
+    rng = np.random.default_rng(seed)
+    n = seconds * per_second
+    if per_second == 1:
+        offsets = np.arange(n) + rng.random(n) * 0.4
+    else:
+        offsets = np.sort(rng.random(n)) * seconds
+    index = pd.DatetimeIndex(
+        pd.Timestamp("2025-04-29 05:16:54.3") + pd.to_timedelta(offsets, "s"),
+        name="datetime",
+    )
+    df = pd.DataFrame(
+        {
+            "tag": "$CWIP_WIND",
+            "lwc [g/m^3]": rng.random(n),
+            "rh [%]": rng.random(n).astype("float32"),
+            "seed-a [cnt]": np.cumsum(rng.random(n) < 0.1) * 1.0,
+            "GPStime [nsec]": pd.array(
+                1_429_999_999_000_000_000 + np.arange(n), dtype="Int64"
+            ),
+            "aircraft": pd.Categorical(["CS02"] * n),
+            "period": pd.Categorical(["Spring 2025"] * n),
+        },
+        index=index,
+    )
+    df.iloc[rng.choice(n, n // 10), 1:5] = np.nan
+    df.iloc[rng.choice(n, n // 20), 0] = np.nan
+    df = df.drop(df.index[(offsets > 30) & (offsets < 40)])  # a gap
+    if shuffle:
+        df = df.iloc[rng.permutation(len(df))]
+    return df
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        records(),
+        records(per_second=3),
+        records(per_second=3, shuffle=True),
+        records(per_second=1, shuffle=True),
+        records().iloc[:0],
+    ],
+    ids=["one-per-second", "several", "unsorted", "unsorted-one", "empty"],
+)
+def test_resample_1s_fast_matches_resample_1s(df):
+    pd.testing.assert_frame_equal(
+        resample_1s_fast(df), resample_1s(df), check_freq=False
+    )